@@ -0,0 +1,52 @@
+from settings import * 
+from collections import OrderedDict
+
+class AssetCache:
+    def __init__(self, budget = ASSET_CACHE_BUDGET):
+        self.budget = budget
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, load, measure):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key][0]
+
+        self.misses += 1
+        value = load()
+        size = measure(value)
+        self.entries[key] = (value, size)
+        self.size += size
+
+        # least recently used assets go first, the newest one always stays
+        while self.size > self.budget and len(self.entries) > 1:
+            _, (_, old_size) = self.entries.popitem(last = False)
+            self.size -= old_size
+        return value
+
+    def discard(self, key):
+        value, size = self.entries.pop(key, (None, 0))
+        self.size -= size
+        return value
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+    def stats(self):
+        return {'entries': len(self.entries), 'bytes': self.size, 'hits': self.hits, 'misses': self.misses}
+
+def surface_size(surf):
+    return surf.get_width() * surf.get_height() * surf.get_bytesize()
+
+def sound_size(sound):
+    frequency, size, channels = pygame.mixer.get_init()
+    return int(sound.get_length() * frequency * channels * abs(size) // 8)
+
+cache = AssetCache()
@@ -0,0 +1,92 @@
+from settings import * 
+from mapcache import fingerprint
+from os.path import relpath, splitext, normpath, abspath, exists
+import json
+
+IMAGES_DIR = join(BASE_DIR, 'images')
+ATLAS_IMAGE = join(BASE_DIR, 'data', 'graphics', 'atlas.png')
+ATLAS_INDEX = join(BASE_DIR, 'data', 'graphics', 'atlas.json')
+ATLAS_WIDTH = 512
+PADDING = 1
+
+atlases = {}
+
+def image_sources():
+    sources = []
+    for folder_path, _, file_names in walk(IMAGES_DIR):
+        for file_name in file_names:
+            if file_name.endswith('.png'):
+                sources.append(relpath(join(folder_path, file_name), IMAGES_DIR))
+    return sorted(sources)
+
+def frame_key(source):
+    return splitext(source)[0].replace('\\', '/')
+
+def build_atlas():
+    sources = image_sources()
+    images = {frame_key(source): pygame.image.load(join(IMAGES_DIR, source)) for source in sources}
+
+    # shelf packing, tallest images first so every shelf wastes little height
+    frames, x, y, shelf_height = {}, PADDING, PADDING, 0
+    for key in sorted(images, key = lambda key: (-images[key].get_height(), key)):
+        width, height = images[key].get_size()
+        if x + width + PADDING > ATLAS_WIDTH:
+            x, y, shelf_height = PADDING, y + shelf_height + PADDING, 0
+        frames[key] = (x, y, width, height)
+        x += width + PADDING
+        shelf_height = max(shelf_height, height)
+
+    surf = pygame.Surface((ATLAS_WIDTH, y + shelf_height + PADDING), pygame.SRCALPHA)
+    for key, (x, y, _, _) in frames.items():
+        surf.blit(images[key], (x, y))
+    pygame.image.save(surf, ATLAS_IMAGE)
+    with open(ATLAS_INDEX, 'w') as file:
+        json.dump({'fingerprint': fingerprint(IMAGES_DIR, sources).hex(), 'frames': frames}, file, indent = 1)
+    return frames
+
+def path_key(path):
+    # path of an image file anywhere on disk, only files under images/ are in the atlas
+    try:
+        return frame_key(relpath(normpath(abspath(path)), IMAGES_DIR))
+    except ValueError:
+        # another drive on windows, so not under images/ either
+        return None
+
+def read_index():
+    index = None
+    if exists(ATLAS_INDEX) and exists(ATLAS_IMAGE):
+        with open(ATLAS_INDEX) as file:
+            index = json.load(file)
+    # rebuilt whenever an image under images/ is added, removed or changed
+    if not index or index['fingerprint'] != fingerprint(IMAGES_DIR, image_sources()).hex():
+        build_atlas()
+        with open(ATLAS_INDEX) as file:
+            index = json.load(file)
+    return index
+
+class Atlas:
+    def __init__(self, surf, frames):
+        self.surf = surf
+        self.frames = frames
+        self.images = {}
+
+    def get(self, path):
+        key = path_key(path)
+        if key not in self.frames:
+            return None
+        if key not in self.images:
+            self.images[key] = self.surf.subsurface(self.frames[key])
+        return self.images[key]
+
+def load_atlas(surf = None, index = None):
+    # preload passes in the atlas image already decoded on a worker thread
+    if 'images' not in atlases:
+        index = index or read_index()
+        if surf is None:
+            surf = pygame.image.load(ATLAS_IMAGE)
+        atlases['images'] = Atlas(surf.convert_alpha(), index['frames'])
+    return atlases['images']
+
+if __name__ == '__main__':
+    frames = build_atlas()
+    print(f'packed {len(frames)} images into {ATLAS_IMAGE}')
@@ -0,0 +1,67 @@
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from settings import * 
+from sprites import Sprite, Bee
+from groups import SpatialGroup
+from support import import_folder, import_image
+from random import randint, seed
+from time import perf_counter
+
+LEVEL_WIDTH, LEVEL_HEIGHT = 45 * TILE_SIZE, 25 * TILE_SIZE
+BULLETS = 50
+FRAMES = 30
+
+def populate(enemy_count, enemy_group, bullet_group, bee_frames, bullet_surf):
+    seed(enemy_count)
+    for _ in range(enemy_count):
+        Bee(bee_frames, (randint(0, LEVEL_WIDTH), randint(0, LEVEL_HEIGHT)), enemy_group, randint(300, 500))
+    for _ in range(BULLETS):
+        Sprite((randint(0, LEVEL_WIDTH), randint(0, LEVEL_HEIGHT)), bullet_surf, bullet_group)
+
+def step(enemy_group):
+    # move every enemy a little so the broad phase pays for its re-bucketing
+    for enemy in enemy_group:
+        enemy.rect.x -= 6
+
+def naive(enemy_group, bullet_group):
+    hits = 0
+    for bullet in bullet_group:
+        hits += len(pygame.sprite.spritecollide(bullet, enemy_group, False, pygame.sprite.collide_mask))
+    return hits
+
+def broad_phase(enemy_group, bullet_group):
+    hits = 0
+    enemy_group.refresh()
+    for bullet in bullet_group:
+        hits += len(enemy_group.collide(bullet, pygame.sprite.collide_mask))
+    return hits
+
+def measure(check, enemy_group, bullet_group):
+    hits = 0
+    start = perf_counter()
+    for _ in range(FRAMES):
+        step(enemy_group)
+        hits += check(enemy_group, bullet_group)
+    return (perf_counter() - start) / FRAMES * 1000, hits
+
+def run(enemy_counts = (50, 200, 1000, 5000)):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    bee_frames = import_folder(BASE_DIR, 'images', 'enemies', 'bee')
+    bullet_surf = import_image(BASE_DIR, 'images', 'gun', 'bullet')
+
+    print(f'{"enemies":>8} {"naive ms":>10} {"broad ms":>10} {"speedup":>8}')
+    for enemy_count in enemy_counts:
+        results = []
+        for check, group in ((naive, pygame.sprite.Group()), (broad_phase, SpatialGroup())):
+            bullets = pygame.sprite.Group()
+            populate(enemy_count, group, bullets, bee_frames, bullet_surf)
+            results.append(measure(check, group, bullets))
+        (naive_ms, naive_hits), (broad_ms, broad_hits) = results
+        assert naive_hits == broad_hits, 'broad phase missed collisions'
+        print(f'{enemy_count:>8} {naive_ms:>10.3f} {broad_ms:>10.3f} {naive_ms / broad_ms:>7.1f}x')
+    pygame.quit()
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,160 @@
+import json
+import cv2
+import numpy as np
+import mediapipe as mp
+from settings import *
+from gestures import GestureWriter
+from hand_control import classify_fingers
+from tracking import AdaptiveInput
+from revision import git_commit
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from time import perf_counter
+
+STAGES = ('decode', 'resize', 'convert', 'inference', 'classify', 'emit')
+BENCH_CHANNEL = GESTURE_CHANNEL + '_bench'
+
+def video_frames(path):
+    capture = cv2.VideoCapture(path)
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                return
+            yield frame
+    finally:
+        capture.release()
+
+def synthetic_frames(width = 640, height = 480):
+    # gradient backdrop with a skin toned blob sliding across, no hand for the model to find
+    base = np.empty((height, width, 3), np.uint8)
+    base[:] = np.linspace(40, 200, width, dtype = np.uint8)[None, :, None]
+    frame_number = 0
+    while True:
+        frame = base.copy()
+        cv2.circle(frame, ((frame_number * 7) % width, height // 2), height // 6, (150, 180, 220), -1)
+        frame_number += 1
+        yield frame
+
+def percentile(values, point):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * point / 100))] if ordered else 0
+
+def measure(frames, resolution, complexity, count, warmup, adaptive = False):
+    timings = {stage: [] for stage in STAGES}
+    end_to_end = []
+    detected = 0
+    channel = GestureWriter(BENCH_CHANNEL)
+    adaptive_input = AdaptiveInput() if adaptive else None
+    gesture = None
+    options = {'max_num_hands': 1, 'model_complexity': complexity, 'min_detection_confidence': 0.5, 'min_tracking_confidence': 0.5}
+    try:
+        with mp.solutions.hands.Hands(static_image_mode = False, **options) as hands:
+            # same steps as HandTracker.infer and hand_control.py, the first frames only warm the model up
+            for frame_number in range(count + warmup):
+                marks = [perf_counter()]
+                frame = next(frames, None)
+                if frame is None:
+                    break
+                marks.append(perf_counter())
+                # adaptive mode leaves out frames where nothing moved, like HandTracker
+                frame = cv2.flip(frame, 1)
+                if adaptive_input and not adaptive_input.moved(frame):
+                    image = None
+                elif (frame.shape[1], frame.shape[0]) != resolution:
+                    image = cv2.resize(frame, resolution, interpolation = cv2.INTER_AREA)
+                else:
+                    image = frame
+                marks.append(perf_counter())
+                hands_found = None
+                if image is not None:
+                    rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+                    marks.append(perf_counter())
+                    hands_found = hands.process(rgb).multi_hand_landmarks
+                    marks.append(perf_counter())
+                    gesture = classify_fingers(hands_found, marks[1])
+                else:
+                    marks += [marks[-1]] * 2
+                    gesture = (gesture or classify_fingers(None, marks[1]))._replace(published = perf_counter())
+                marks.append(perf_counter())
+                channel.publish(gesture)
+                marks.append(perf_counter())
+
+                if frame_number < warmup:
+                    continue
+                for stage, start, end in zip(STAGES, marks, marks[1:]):
+                    timings[stage].append(end - start)
+                # a skipped frame republishes an older gesture, it is not a latency sample
+                if image is not None:
+                    end_to_end.append(marks[-1] - marks[1])
+                detected += bool(hands_found)
+    finally:
+        channel.close()
+
+    processed = len(timings['decode'])
+    total = sum(sum(values) for values in timings.values())
+    return {
+        'frames': processed,
+        'fps': processed / total if total else 0,
+        'detected': detected / len(end_to_end) if end_to_end else 0,
+        'skipped': adaptive_input.stats['skipped'] / (count + warmup) if adaptive_input else 0,
+        'stage_ms': {stage: sum(values) / len(values) * 1000 if values else 0 for stage, values in timings.items()},
+        'latency_ms': {f'p{point}': percentile(end_to_end, point) * 1000 for point in (50, 95, 99)},
+    }
+
+def print_result(name, result):
+    latency = result['latency_ms']
+    print(f'{name:<16} {result["frames"]:>5} frames {result["fps"]:>7.1f} fps  hands in {result["detected"]:.0%}  skipped {result["skipped"]:.0%}'
+        f'  latency p50 {latency["p50"]:.1f} p95 {latency["p95"]:.1f} p99 {latency["p99"]:.1f} ms')
+    print('  ' + '  '.join(f'{stage} {ms:.2f}' for stage, ms in result['stage_ms'].items()))
+
+def run(video, complexities, resolutions, frames, warmup, adaptive = False):
+    results = {}
+    for complexity in complexities:
+        for width, height in resolutions:
+            name = f'c{complexity} {width}x{height}'
+            source = video_frames(video) if video else synthetic_frames()
+            results[name] = measure(source, (width, height), complexity, frames, warmup, adaptive)
+            print_result(name, results[name])
+    return {
+        'commit': git_commit(),
+        'date': datetime.now(timezone.utc).isoformat(timespec = 'seconds'),
+        'source': video or 'synthetic',
+        'adaptive': adaptive,
+        'results': results,
+    }
+
+def compare(current, previous):
+    print(f'\ncompared with {previous.get("commit") or "previous run"} (p95 latency ms, negative is faster)')
+    for name, result in current['results'].items():
+        old = previous['results'].get(name)
+        if not old or not old['latency_ms']['p95']:
+            continue
+        before, after = old['latency_ms']['p95'], result['latency_ms']['p95']
+        print(f'  {name:<16} {before:>8.2f} -> {after:>8.2f} ({(after - before) / before * 100:+.1f}%)')
+
+def parse_resolution(text):
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description = 'Time the hand tracking pipeline stage by stage on a video file or synthetic frames, no camera needed.')
+    parser.add_argument('--video', help = 'recorded video file (default: synthetic frames)')
+    parser.add_argument('--frames', type = int, default = 300)
+    parser.add_argument('--warmup', type = int, default = 10, help = 'frames run before timing starts')
+    parser.add_argument('--complexity', type = int, nargs = '+', choices = (0, 1), default = [0, 1])
+    parser.add_argument('--resolution', type = parse_resolution, nargs = '+', default = [(640, 480), (320, 240)])
+    parser.add_argument('--adaptive', action = 'store_true', help = 'skip still frames like HandTracker')
+    parser.add_argument('--output', help = 'write the results to this JSON file')
+    parser.add_argument('--compare', help = 'JSON file from an earlier run to compare against')
+    args = parser.parse_args()
+
+    if args.adaptive and not args.video:
+        print('synthetic frames have no hand in them, pass --video with a recorded hand to judge --adaptive')
+    results = run(args.video, args.complexity, args.resolution, args.frames, args.warmup, args.adaptive)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent = 2)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
@@ -0,0 +1,131 @@
+import json
+import xml.etree.ElementTree as ElementTree
+from headless import *
+from support import unload_map
+from revision import git_commit
+from tempfile import TemporaryDirectory
+from random import randint
+from datetime import datetime, timezone
+
+MAP_PATH = join(BASE_DIR, 'data', 'maps', 'world.tmx')
+TILESET_PATH = join(BASE_DIR, 'data', 'tilesets', 'tilemap.tsx')
+
+def generate_map(path, repeat = 10):
+    # world.tmx laid out `repeat` times side by side, worms copied into every section
+    tree = ElementTree.parse(MAP_PATH)
+    root = tree.getroot()
+    width = int(root.get('width'))
+    root.set('width', str(width * repeat))
+    root.find('tileset').set('source', TILESET_PATH)
+
+    for layer in root.iter('layer'):
+        layer.set('width', str(width * repeat))
+        data = layer.find('data')
+        rows = [row.rstrip(',') for row in data.text.strip().splitlines()]
+        data.text = '\n' + ',\n'.join(','.join([row] * repeat) for row in rows) + '\n'
+
+    entities = root.find('objectgroup')
+    worms = [obj for obj in entities if obj.get('name') == 'Worm']
+    next_id = int(root.get('nextobjectid'))
+    for section in range(1, repeat):
+        for worm in worms:
+            copy = ElementTree.SubElement(entities, 'object', dict(worm.attrib))
+            copy.set('id', str(next_id))
+            copy.set('x', str(float(worm.get('x')) + section * width * TILE_SIZE))
+            next_id += 1
+    root.set('nextobjectid', str(next_id))
+    tree.write(path, encoding = 'UTF-8', xml_declaration = True)
+
+def idle_script(frame):
+    return set()
+
+def fire_script(frame):
+    return {pygame.K_s}
+
+def spawn_bees(game):
+    for _ in range(1000):
+        game.create_bee()
+
+def refill_bullets(game, count = 500):
+    while len(game.bullet_sprites) < count:
+        direction = 1 if randint(0, 1) else -1
+        pos = (randint(0, int(game.level_width)), randint(0, int(game.level_height)))
+        game.pools['bullet'].spawn(game.bullet_surf, pos, direction, (game.all_sprites, game.bullet_sprites))
+
+def scenario_baseline(frames):
+    return HeadlessGame().simulate(frames)
+
+def scenario_bees(frames):
+    game = HeadlessGame(script = idle_script)
+    spawn_bees(game)
+    return game.simulate(frames)
+
+def scenario_bullets(frames):
+    return HeadlessGame(script = idle_script).simulate(frames, before_frame = refill_bullets)
+
+def scenario_big_map(frames):
+    with TemporaryDirectory() as folder:
+        path = join(folder, 'world_x10.tmx')
+        generate_map(path)
+        try:
+            return HeadlessGame(map_path = path).simulate(frames)
+        finally:
+            # the cache keeps the map mapped, windows will not delete the folder until it lets go
+            unload_map(path)
+
+def rapid_fire(game):
+    # drop the shot cooldown so a bullet and muzzle flash spawn every frame, not five a second
+    game.player.shoot_timer.cancel()
+
+def scenario_sustained_fire(frames):
+    return HeadlessGame(script = fire_script).simulate(frames, before_frame = rapid_fire)
+
+SCENARIOS = {
+    'baseline': scenario_baseline,
+    'bees_1000': scenario_bees,
+    'bullets_500': scenario_bullets,
+    'big_map_x10': scenario_big_map,
+    'sustained_fire': scenario_sustained_fire,
+}
+
+def run(names, frames):
+    results = {}
+    for name in names:
+        print(f'-- {name}')
+        results[name] = SCENARIOS[name](frames)
+        print_report(results[name])
+    return {
+        'commit': git_commit(),
+        'date': datetime.now(timezone.utc).isoformat(timespec = 'seconds'),
+        'frames': frames,
+        'scenarios': results,
+    }
+
+def compare(current, previous):
+    print(f'\ncompared with {previous.get("commit") or "previous run"} (frame ms, negative is faster)')
+    for name, report in current['scenarios'].items():
+        old = previous['scenarios'].get(name)
+        if not old:
+            continue
+        change = (report['frame_ms'] - old['frame_ms']) / old['frame_ms'] * 100
+        print(f'  {name:<16} {old["frame_ms"]:>8.3f} -> {report["frame_ms"]:>8.3f} ({change:+.1f}%)')
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description = 'Run the stress scenarios headlessly and save the timings as JSON.')
+    parser.add_argument('scenarios', nargs = '*', help = f'any of {", ".join(SCENARIOS)} (default: all)')
+    parser.add_argument('--frames', type = int, default = 600)
+    parser.add_argument('--output', help = 'write the results to this JSON file')
+    parser.add_argument('--compare', help = 'JSON file from an earlier run to compare against')
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f'unknown scenarios: {", ".join(sorted(unknown))}')
+
+    results = run(args.scenarios or list(SCENARIOS), args.frames)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent = 2)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+    pygame.quit()
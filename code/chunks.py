@@ -0,0 +1,43 @@
+from settings import * 
+from collections import OrderedDict
+from math import floor
+
+class TileChunks:
+    def __init__(self, chunk_tiles = CHUNK_TILES, cache_size = CHUNK_CACHE_SIZE):
+        self.chunk_size = chunk_tiles * TILE_SIZE
+        self.cache_size = cache_size
+        self.tiles = {}
+        self.surfaces = OrderedDict()
+
+    def add(self, pos, surf):
+        chunk = (pos[0] // self.chunk_size, pos[1] // self.chunk_size)
+        self.tiles.setdefault(chunk, []).append((pos, surf))
+        self.surfaces.pop(chunk, None)
+
+    def bake(self, chunk):
+        left, top = chunk[0] * self.chunk_size, chunk[1] * self.chunk_size
+        surf = pygame.Surface((self.chunk_size, self.chunk_size), pygame.SRCALPHA)
+        for (x, y), image in self.tiles[chunk]:
+            surf.blit(image, (x - left, y - top))
+        # chunks are mostly empty space, RLE lets the blit skip the transparent runs
+        surf = surf.convert_alpha()
+        surf.set_alpha(255, pygame.RLEACCEL)
+        return surf
+
+    def get(self, chunk):
+        if chunk in self.surfaces:
+            self.surfaces.move_to_end(chunk)
+        else:
+            self.surfaces[chunk] = self.bake(chunk)
+            if len(self.surfaces) > self.cache_size:
+                self.surfaces.popitem(last = False)
+        return self.surfaces[chunk]
+
+    def draw(self, surface, camera, offset):
+        size = self.chunk_size
+        # floor the offset so chunks land on the same pixels the single tiles would
+        offset_x, offset_y = floor(offset.x), floor(offset.y)
+        for x in range(floor(camera.left / size), floor(camera.right / size) + 1):
+            for y in range(floor(camera.top / size), floor(camera.bottom / size) + 1):
+                if (x, y) in self.tiles:
+                    surface.blit(self.get((x, y)), (x * size + offset_x, y * size + offset_y))
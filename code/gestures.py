@@ -0,0 +1,113 @@
+from settings import *
+from collections import namedtuple, deque
+from multiprocessing import shared_memory
+from time import perf_counter
+import struct
+import os
+
+# perf_counter is system wide on windows and linux, so timestamps compare across processes
+Gesture = namedtuple('Gesture', ('left', 'right', 'jump', 'shoot', 'captured', 'published'))
+NO_GESTURE = Gesture(False, False, False, False, 0, 0)
+GESTURE_KEYS = {pygame.K_LEFT: 'left', pygame.K_RIGHT: 'right', pygame.K_SPACE: 'jump', pygame.K_s: 'shoot'}
+
+# sequence, then button bits, capture time and publish time, stored separately so the sequence brackets the payload
+SEQUENCE = struct.Struct('<I')
+PAYLOAD = struct.Struct('<B3xdd')
+SIZE = SEQUENCE.size + PAYLOAD.size
+BUTTONS = ('left', 'right', 'jump', 'shoot')
+
+class GestureKeys:
+    # keyboard state with the current gesture held down on top
+    def __init__(self, gesture, keys):
+        self.gesture = gesture
+        self.keys = keys
+
+    def __getitem__(self, key):
+        return self.keys[key] or (key in GESTURE_KEYS and getattr(self.gesture, GESTURE_KEYS[key]))
+
+def attach(name):
+    memory = shared_memory.SharedMemory(name)
+    if os.name == 'posix':
+        # readers must not unlink the writer's segment when they exit
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(memory._name, 'shared_memory')
+    return memory
+
+class GestureWriter:
+    def __init__(self, name = GESTURE_CHANNEL):
+        try:
+            self.memory = shared_memory.SharedMemory(name, create = True, size = SIZE)
+        except FileExistsError:
+            # left behind by a tracker that crashed, take it over
+            self.memory = shared_memory.SharedMemory(name)
+        self.sequence = SEQUENCE.unpack_from(self.memory.buf)[0] & ~1
+
+    def publish(self, gesture):
+        # odd sequence, payload, even sequence as three stores, readers retry when the sequence moved underneath them
+        buttons = sum(1 << i for i, button in enumerate(BUTTONS) if getattr(gesture, button))
+        self.sequence += 1
+        SEQUENCE.pack_into(self.memory.buf, 0, self.sequence)
+        PAYLOAD.pack_into(self.memory.buf, SEQUENCE.size, buttons, gesture.captured, gesture.published)
+        self.sequence += 1
+        SEQUENCE.pack_into(self.memory.buf, 0, self.sequence)
+
+    def close(self):
+        self.memory.close()
+        self.memory.unlink()
+
+class GestureReader:
+    def __init__(self, name = GESTURE_CHANNEL):
+        self.name = name
+        self.memory = None
+        self.gesture = NO_GESTURE
+        self.sequence = 0
+        self.checked = 0
+        self.latencies = deque(maxlen = 600)
+
+    def read(self):
+        # never blocks, no tracker or a stale gesture reads as no input
+        now = perf_counter()
+        if (not self.memory or now - self.gesture.published > GESTURE_TIMEOUT) and now - self.checked > 1:
+            self.reattach(now)
+        if not self.memory:
+            return NO_GESTURE
+
+        for _ in range(3):
+            sequence = SEQUENCE.unpack_from(self.memory.buf)[0]
+            buttons, captured, published = PAYLOAD.unpack_from(self.memory.buf, SEQUENCE.size)
+            if sequence % 2 == 0 and SEQUENCE.unpack_from(self.memory.buf)[0] == sequence:
+                break
+        else:
+            return self.gesture if now - self.gesture.published < GESTURE_TIMEOUT else NO_GESTURE
+
+        if sequence != self.sequence and published:
+            # time from the camera frame to the game loop picking the gesture up, a republished gesture is no new sample
+            self.sequence = sequence
+            if captured != self.gesture.captured:
+                self.latencies.append(perf_counter() - captured)
+            self.gesture = Gesture(*(bool(buttons & 1 << i) for i in range(len(BUTTONS))), captured, published)
+        return self.gesture if now - self.gesture.published < GESTURE_TIMEOUT else NO_GESTURE
+
+    def reattach(self, now):
+        # the tracker may have restarted with a fresh segment
+        self.checked = now
+        if self.memory:
+            self.memory.close()
+        try:
+            self.memory = attach(self.name)
+        except FileNotFoundError:
+            self.memory = None
+
+    def keys(self):
+        return GestureKeys(self.read(), pygame.key.get_pressed())
+
+    def latency_ms(self):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return {f'p{p}': ordered[min(len(ordered) - 1, len(ordered) * p // 100)] * 1000 for p in (50, 95, 99)}
+
+    def close(self):
+        if self.memory:
+            self.memory.close()
+            self.memory = None
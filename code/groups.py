@@ -1,14 +1,143 @@
 from settings import * 
+from spatial import SpatialGrid
 
-class AllSprites(pygame.sprite.Group):
+class SpatialGroup(pygame.sprite.Group):
+    def __init__(self, cell_size = SPATIAL_CELL_SIZE):
+        super().__init__()
+        self.grid = SpatialGrid(cell_size)
+        self.pending = set()
+        self.moving = set()
+
+    def add_internal(self, sprite, layer = None):
+        super().add_internal(sprite, layer)
+        # sprites join their groups before their rect is set, so index them on the next refresh
+        self.pending.add(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.pending.discard(sprite)
+        self.moving.discard(sprite)
+        self.grid.remove(sprite)
+
+    def refresh(self):
+        for sprite in self.pending:
+            self.grid.insert(sprite)
+            if type(sprite).update is not pygame.sprite.Sprite.update:
+                self.moving.add(sprite)
+        self.pending.clear()
+
+        for sprite in self.moving:
+            self.grid.move(sprite)
+
+    def near(self, rect):
+        return self.grid.query(rect)
+
+    def collide(self, sprite, collided = None):
+        # cheap rect test on the nearby sprites before any pixel test
+        return [other for other in self.near(sprite.rect)
+                if sprite.rect.colliderect(other.rect) and (collided is None or collided(sprite, other))]
+
+class AllSprites(SpatialGroup):
     def __init__(self):
         super().__init__()
         self.display_surface = pygame.display.get_surface()
         self.offset = pygame.Vector2()
+        self.camera = pygame.FRect(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.draw_order = {}
+        self.added = 0
+        self.static_tiles = None
+        self.previous = {}
+
+    def add_internal(self, sprite, layer = None):
+        super().add_internal(sprite, layer)
+        self.draw_order[sprite] = self.added
+        self.added += 1
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        del self.draw_order[sprite]
+        self.previous.pop(sprite, None)
 
-    def draw(self, target_pos):
+    def snapshot(self):
+        # positions before a simulation step, drawing blends from these to the current ones
+        self.previous = {sprite: sprite.rect.topleft for sprite in self.moving}
+
+    def interpolated_center(self, sprite, alpha):
+        x, y = sprite.rect.center
+        previous = self.previous.get(sprite) if alpha < 1 else None
+        if previous:
+            x += (previous[0] - sprite.rect.left) * (1 - alpha)
+            y += (previous[1] - sprite.rect.top) * (1 - alpha)
+        return x, y
+
+    def draw(self, target_pos, alpha = 1):
         self.offset.x = -(target_pos[0] - WINDOW_WIDTH / 2)
         self.offset.y = -(target_pos[1] - WINDOW_HEIGHT / 2)
+        self.camera.topleft = -self.offset
+
+        if self.static_tiles:
+            self.static_tiles.draw(self.display_surface, self.camera, self.offset)
 
+        # interpolated sprites can sit a little outside their rect, so query a slightly larger area
+        self.refresh()
+        visible = self.near(self.camera.inflate(TILE_SIZE, TILE_SIZE))
+        for sprite in sorted(visible, key = self.draw_order.__getitem__):
+            x, y = sprite.rect.topleft
+            previous = self.previous.get(sprite) if alpha < 1 else None
+            if previous:
+                x, y = previous[0] + (x - previous[0]) * alpha, previous[1] + (y - previous[1]) * alpha
+            self.display_surface.blit(sprite.image, (x + self.offset.x, y + self.offset.y))
+
+class ProjectileSprites(pygame.sprite.Group):
+    def __init__(self, lifetime = BULLET_LIFETIME):
+        super().__init__()
+        self.lifetime = lifetime
+        self.bounds = pygame.FRect()
+        self.ages = {}
+
+    def add_internal(self, sprite, layer = None):
+        super().add_internal(sprite, layer)
+        self.ages[sprite] = 0
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        del self.ages[sprite]
+
+    def expire(self, dt):
+        # projectiles that missed die once they leave the level or outlive their lifetime
+        for sprite in self.sprites():
+            self.ages[sprite] += dt
+            if self.ages[sprite] >= self.lifetime or not self.bounds.colliderect(sprite.rect):
+                sprite.kill()
+
+class CollisionSprites(pygame.sprite.Group):
+    def __init__(self):
+        super().__init__()
+        self.grid = None
+        self.columns, self.rows = 0, 0
+
+    def add_internal(self, sprite, layer = None):
+        super().add_internal(sprite, layer)
+        self.grid = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.grid = None
+
+    def build_grid(self):
+        # collision tiles sit on the TILE_SIZE grid, so each one owns the cell under its topleft
+        self.columns = max((int(sprite.rect.left // TILE_SIZE) for sprite in self), default = -1) + 1
+        self.rows = max((int(sprite.rect.top // TILE_SIZE) for sprite in self), default = -1) + 1
+        self.grid = [[None] * self.columns for _ in range(self.rows)]
         for sprite in self:
-            self.display_surface.blit(sprite.image, sprite.rect.topleft + self.offset)
\ No newline at end of file
+            col, row = int(sprite.rect.left // TILE_SIZE), int(sprite.rect.top // TILE_SIZE)
+            if col >= 0 and row >= 0:
+                self.grid[row][col] = sprite
+
+    def near(self, rect):
+        if self.grid is None:
+            self.build_grid()
+
+        left, right = max(int(rect.left // TILE_SIZE), 0), min(int(rect.right // TILE_SIZE), self.columns - 1)
+        top, bottom = max(int(rect.top // TILE_SIZE), 0), min(int(rect.bottom // TILE_SIZE), self.rows - 1)
+        return [sprite for row in self.grid[top:bottom + 1] for sprite in row[left:right + 1] if sprite]
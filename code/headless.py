@@ -0,0 +1,97 @@
+import os
+from settings import * 
+from timer import scheduler
+from main import Game
+from random import seed
+from time import perf_counter
+from argparse import ArgumentParser
+
+PHASES = ('timers', 'update', 'collision', 'draw')
+
+class ScriptedKeys:
+    def __init__(self, pressed):
+        self.pressed = pressed
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+def default_script(frame):
+    # run right and left in turns while holding fire, jumping now and then
+    keys = {pygame.K_RIGHT if (frame // 120) % 2 == 0 else pygame.K_LEFT, pygame.K_s}
+    if frame % 45 == 0:
+        keys.add(pygame.K_SPACE)
+    return keys
+
+class HeadlessGame(Game):
+    def __init__(self, script = default_script, dt = 1 / FRAMERATE, random_seed = 0, **kwargs):
+        # no window and no sound card, set before Game calls pygame.init
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+        scheduler.clear()
+        seed(random_seed)
+
+        self.script = script
+        self.dt = dt
+        self.frame = 0
+        super().__init__(**kwargs)
+        self.player.input_source = lambda: ScriptedKeys(self.script(self.frame))
+
+    def step(self, timings):
+        pygame.event.pump()
+
+        # dt is fed to the fixed step simulation as if the frame took that long
+        for dt in self.simulation.steps(self.dt):
+            start = perf_counter()
+            scheduler.update()
+            timers = perf_counter()
+            self.all_sprites.snapshot()
+            self.all_sprites.update(dt)
+            self.bullet_sprites.expire(dt)
+            update = perf_counter()
+            self.collision()
+            collision = perf_counter()
+
+            timings['timers'] += timers - start
+            timings['update'] += update - timers
+            timings['collision'] += collision - update
+
+        start = perf_counter()
+        alpha = self.simulation.alpha
+        self.display_surface.fill(BG_COLOR)
+        self.all_sprites.draw(self.all_sprites.interpolated_center(self.player, alpha), alpha)
+        pygame.display.update()
+        timings['draw'] += perf_counter() - start
+        self.frame += 1
+
+    def simulate(self, frames, before_frame = None):
+        timings = {phase: 0 for phase in PHASES}
+        start = perf_counter()
+        for _ in range(frames):
+            if before_frame:
+                before_frame(self)
+            self.step(timings)
+        total = perf_counter() - start
+
+        return {
+            'frames': frames,
+            'fps': frames / total,
+            'frame_ms': total / frames * 1000,
+            'phase_ms': {phase: timings[phase] / frames * 1000 for phase in PHASES},
+            'entities': self.entity_counts(),
+        }
+
+def print_report(report):
+    print(f'{report["frames"]} frames, {report["fps"]:.1f} fps, {report["frame_ms"]:.3f} ms/frame')
+    for phase, ms in report['phase_ms'].items():
+        print(f'  {phase:<10} {ms:.3f} ms')
+    print('  entities', report['entities'])
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description = 'Run the game without a window and time every phase.')
+    parser.add_argument('--frames', type = int, default = 1000)
+    parser.add_argument('--seed', type = int, default = 0)
+    args = parser.parse_args()
+
+    game = HeadlessGame(random_seed = args.seed)
+    print_report(game.simulate(args.frames))
+    pygame.quit()
@@ -0,0 +1,32 @@
+from settings import * 
+from collections import OrderedDict
+
+fonts = {}
+
+def get_font(size, name = None):
+    # one font object per face and size for the whole process
+    if (name, size) not in fonts:
+        fonts[name, size] = pygame.font.Font(name, size)
+    return fonts[name, size]
+
+class TextCache:
+    def __init__(self, size = TEXT_CACHE_SIZE):
+        self.size = size
+        self.surfaces = OrderedDict()
+
+    def render(self, text, font_size, color = 'white', font_name = None):
+        # strings are only rendered again when their content changes
+        key = (text, font_size, color, font_name)
+        if key in self.surfaces:
+            self.surfaces.move_to_end(key)
+            return self.surfaces[key]
+
+        surf = self.surfaces[key] = get_font(font_size, font_name).render(text, True, color)
+        if len(self.surfaces) > self.size:
+            self.surfaces.popitem(last = False)
+        return surf
+
+texts = TextCache()
+
+def render_text(text, font_size, color = 'white', font_name = None):
+    return texts.render(text, font_size, color, font_name)
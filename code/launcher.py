@@ -0,0 +1,150 @@
+import os
+import signal
+import subprocess
+import sys
+from settings import *
+from argparse import ArgumentParser
+from time import monotonic, sleep
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+CODE_DIR = dirname(abspath(__file__))
+
+def pin(pid, cores):
+    # cores the machine does not have are dropped, a single core box runs unpinned
+    cores = [core for core in cores if core < os.cpu_count()]
+    if not cores or len(cores) == os.cpu_count():
+        return None
+    if psutil:
+        psutil.Process(pid).cpu_affinity(cores)
+    elif hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(pid, cores)
+    else:
+        return None
+    return cores
+
+class Child:
+    def __init__(self, name, script, cores):
+        self.name = name
+        self.script = script
+        self.cores = cores
+        self.process = None
+        self.stats = None
+        self.started = 0
+        self.restarts = []
+
+    def start(self):
+        self.process = subprocess.Popen([sys.executable, join(CODE_DIR, self.script)], cwd = CODE_DIR)
+        self.stats = psutil.Process(self.process.pid) if psutil else None
+        self.started = monotonic()
+        cores = pin(self.process.pid, self.cores)
+        print(f'[launcher] {self.name} started, pid {self.process.pid}, cores {cores or "any"}')
+
+    def exit_code(self):
+        return self.process.poll() if self.process else None
+
+    def usage(self):
+        # cpu percent is measured since the previous call, the first one reads as 0
+        try:
+            return self.stats.cpu_percent(None), self.stats.memory_info().rss / 2 ** 20
+        except (AttributeError, psutil.Error if psutil else OSError):
+            return None
+
+    def stop(self, timeout = LAUNCHER_STOP_TIMEOUT):
+        if not self.process or self.process.poll() is not None:
+            return
+        # SIGTERM lets the child run its cleanup, windows has no gentler option than terminate
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        print(f'[launcher] {self.name} stopped')
+
+class Supervisor:
+    def __init__(self, game, tracker):
+        self.game = game
+        self.tracker = tracker
+        self.children = (game, tracker)
+        self.retry_at = None
+        self.reported = monotonic()
+
+    def run(self):
+        for child in self.children:
+            child.start()
+        try:
+            while True:
+                code = self.game.exit_code()
+                if code is not None:
+                    print(f'[launcher] game exited with {code}')
+                    return code
+                self.watch_tracker()
+                if monotonic() - self.reported > LAUNCHER_REPORT_INTERVAL:
+                    self.report()
+                sleep(LAUNCHER_POLL_INTERVAL)
+        except KeyboardInterrupt:
+            return 130
+        finally:
+            self.shutdown()
+
+    def watch_tracker(self):
+        # the game keeps running on the keyboard while the tracker is down
+        code = self.tracker.exit_code()
+        if code is None or self.tracker.process is None:
+            return
+        if code == 0:
+            # quit on purpose, 'q' in the preview window
+            print('[launcher] tracker exited, not restarting')
+            self.tracker.process = None
+            return
+        now = monotonic()
+        if self.retry_at is None:
+            self.tracker.restarts = [time for time in self.tracker.restarts if now - time < 60]
+            if len(self.tracker.restarts) >= LAUNCHER_MAX_RESTARTS:
+                print(f'[launcher] tracker exited with {code}, {LAUNCHER_MAX_RESTARTS} restarts in the last minute, giving up')
+                self.tracker.process = None
+                return
+            # quick crashes back off, one that ran for a while is restarted straight away
+            delay = 0 if now - self.tracker.started > 30 else min(2 ** len(self.tracker.restarts), 10)
+            print(f'[launcher] tracker exited with {code}, restarting in {delay} s')
+            self.retry_at = now + delay
+        if now >= self.retry_at:
+            self.retry_at = None
+            self.tracker.restarts.append(now)
+            self.tracker.start()
+
+    def report(self):
+        self.reported = monotonic()
+        if not psutil:
+            return
+        lines = []
+        for child in self.children:
+            usage = child.usage() if child.exit_code() is None else None
+            lines.append(f'{child.name} {usage[0]:.0f}% cpu {usage[1]:.0f} MB' if usage else f'{child.name} down')
+        print('[launcher] ' + ', '.join(lines))
+
+    def shutdown(self):
+        # the game goes first so it never sits there without input
+        for child in self.children:
+            child.stop()
+
+def main():
+    parser = ArgumentParser(description = 'Run the game and the hand tracker as supervised processes.')
+    parser.add_argument('--game', default = 'testing2.py', help = 'game script in the code folder')
+    parser.add_argument('--tracker', default = 'hand_control.py', help = 'hand tracker script in the code folder')
+    args = parser.parse_args()
+
+    # the game stays unpinned so its loader pool can use every core, the tracker keeps off LAUNCHER_GAME_CORES so the main loop always has one free
+    game = Child('game', args.game, ())
+    tracker = Child('tracker', args.tracker, [core for core in range(os.cpu_count()) if core not in LAUNCHER_GAME_CORES])
+    if not psutil:
+        print('[launcher] psutil is not installed, cpu and memory are not reported')
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(143))
+    sys.exit(Supervisor(game, tracker).run())
+
+if __name__ == '__main__':
+    main()
@@ -1,35 +1,47 @@
 import pygame
 from settings import *
 from sprites import *
-from groups import AllSprites
+from groups import AllSprites, CollisionSprites, SpatialGroup, ProjectileSprites
+from chunks import TileChunks
 from support import *
-from timer import Timer
+from timer import Timer, FixedStep, scheduler
+from pool import Pool
+from profiler import FrameProfiler
 from random import randint
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, map_path = join(BASE_DIR, 'data', 'maps', 'world.tmx')):
         pygame.init()
         self.display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption('Platformer')
         self.clock = pygame.time.Clock()
         self.running = True
+        self.map_path = map_path
+        self.profiler = FrameProfiler()
+
+        # Simulation runs in fixed steps on its own clock
+        self.simulation = FixedStep()
+        scheduler.clock = self.simulation.clock
 
         # Groups
         self.all_sprites = AllSprites()
-        self.collision_sprites = pygame.sprite.Group()
-        self.bullet_sprites = pygame.sprite.Group()
-        self.enemy_sprites = pygame.sprite.Group()
+        self.collision_sprites = CollisionSprites()
+        self.bullet_sprites = ProjectileSprites()
+        self.enemy_sprites = SpatialGroup()
+
+        # Pools
+        self.pools = {'bee': Pool(Bee), 'bullet': Pool(Bullet), 'fire': Pool(Fire)}
 
         # Load game
-        self.load_assets()
+        self.load_assets(self.draw_loading)
         self.setup()
 
         # Timers
         self.bee_timer = Timer(100, func=self.create_bee, autostart=True, repeat=True)
 
     def create_bee(self):
-        Bee(
+        self.pools['bee'].spawn(
             frames=self.bee_frames,
             pos=((self.level_width + WINDOW_WIDTH), (randint(0, self.level_height))),
             groups=(self.all_sprites, self.enemy_sprites),
@@ -38,32 +50,65 @@ class Game:
 
     def create_bullet(self, pos, direction):
         x = pos[0] + direction * 34 if direction == 1 else pos[0] + direction * 34 - self.bullet_surf.get_width()
-        Bullet(self.bullet_surf, (x, pos[1]), direction, (self.all_sprites, self.bullet_sprites))
-        Fire(self.fire_surf, pos, self.all_sprites, self.player)
+        self.pools['bullet'].spawn(self.bullet_surf, (x, pos[1]), direction, (self.all_sprites, self.bullet_sprites))
+        self.pools['fire'].spawn(self.fire_surf, pos, self.all_sprites, self.player)
         self.audio['shoot'].play()
 
-    def load_assets(self):
-        # Absolute paths for graphics
-        self.player_frames = import_folder(r'D:\Programming\Platform 4 finish\images\player')  # Updated path
-        self.bullet_surf = import_image(r'D:\Programming\Platform 4 finish\images\gun', 'bullet')  # Updated path
-        self.fire_surf = import_image(r'D:\Programming\Platform 4 finish\images\gun', 'fire')  # Updated path
-        self.bee_frames = import_folder(r'D:\Programming\Platform 4 finish\images\enemies\bee')  # Updated path
-        self.worm_frames = import_folder(r'D:\Programming\Platform 4 finish\images\enemies\worm')  # Updated path
-
-        # Absolute path for sounds
-        self.audio = audio_importer(r'D:\Programming\Platform 4 finish\audio')  # Updated path
+    def pool_stats(self):
+        return {name: pool.stats for name, pool in self.pools.items()}
+
+    def entity_counts(self):
+        return {
+            'all': len(self.all_sprites),
+            'collision': len(self.collision_sprites),
+            'bullets': len(self.bullet_sprites),
+            'enemies': len(self.enemy_sprites),
+        }
+
+    def draw_loading(self, done, total):
+        # progress bar while assets decode, events pumped so the window stays responsive
+        pygame.event.pump()
+        bar = pygame.FRect(0, 0, WINDOW_WIDTH / 2, 12)
+        bar.center = (WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2)
+        self.display_surface.fill(BG_COLOR)
+        pygame.draw.rect(self.display_surface, 'white', (bar.left, bar.top, bar.width * done / total, bar.height))
+        pygame.draw.rect(self.display_surface, 'white', bar, 1)
+        pygame.display.update()
+
+    def load_assets(self, progress = None):
+        preload(join(BASE_DIR, 'images'), join(BASE_DIR, 'audio'), progress = progress)
+
+        # Graphics, relative to the project folder so the game also runs on CI boxes
+        self.player_frames = flip_frames(import_folder(BASE_DIR, 'images', 'player'))
+        self.bullet_surf = import_image(BASE_DIR, 'images', 'gun', 'bullet')
+        self.fire_surf = import_image(BASE_DIR, 'images', 'gun', 'fire')
+        self.bee_frames = import_folder(BASE_DIR, 'images', 'enemies', 'bee')
+        self.worm_frames = flip_frames(import_folder(BASE_DIR, 'images', 'enemies', 'worm'))
+
+        # Sounds
+        self.audio = audio_importer(BASE_DIR, 'audio')
 
     def setup(self):
-        # Absolute path for map file
-        tmx_map = load_pygame(r'D:\Programming\Platform 4 finish\data\maps\world.tmx')  # Updated path
+        tmx_map = import_map(self.map_path)
         self.level_width = tmx_map.width * TILE_SIZE
         self.level_height = tmx_map.height * TILE_SIZE
+        self.bullet_sprites.bounds = pygame.FRect(0, 0, self.level_width, self.level_height)
 
+        # static layers are either baked into chunk surfaces or kept as one sprite per tile
+        self.all_sprites.static_tiles = TileChunks() if BAKE_STATIC_TILES else None
         for x, y, image in tmx_map.get_layer_by_name('Main').tiles():
-            Sprite((x * TILE_SIZE, y * TILE_SIZE), image, (self.all_sprites, self.collision_sprites))
+            if BAKE_STATIC_TILES:
+                self.all_sprites.static_tiles.add((x * TILE_SIZE, y * TILE_SIZE), image)
+                Sprite((x * TILE_SIZE, y * TILE_SIZE), image, self.collision_sprites)
+            else:
+                Sprite((x * TILE_SIZE, y * TILE_SIZE), image, (self.all_sprites, self.collision_sprites))
+        self.collision_sprites.build_grid()
 
         for x, y, image in tmx_map.get_layer_by_name('Decoration').tiles():
-            Sprite((x * TILE_SIZE, y * TILE_SIZE), image, self.all_sprites)
+            if BAKE_STATIC_TILES:
+                self.all_sprites.static_tiles.add((x * TILE_SIZE, y * TILE_SIZE), image)
+            else:
+                Sprite((x * TILE_SIZE, y * TILE_SIZE), image, self.all_sprites)
 
         for obj in tmx_map.get_layer_by_name('Entities'):
             if obj.name == 'Player':
@@ -86,8 +131,9 @@ class Game:
 
     def collision(self):
         # Bullets -> enemies
+        self.enemy_sprites.refresh()
         for bullet in self.bullet_sprites:
-            sprite_collision = pygame.sprite.spritecollide(bullet, self.enemy_sprites, False, pygame.sprite.collide_mask)
+            sprite_collision = self.enemy_sprites.collide(bullet, pygame.sprite.collide_mask)
             if sprite_collision:
                 self.audio['impact'].play()
                 bullet.kill()
@@ -100,21 +146,35 @@ class Game:
 
     def run(self):
         while self.running:
-            dt = self.clock.tick(FRAMERATE) / 1000
+            frame_time = self.clock.tick(FRAMERATE) / 1000
+            self.profiler.begin()
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.running = False
+                self.profiler.handle_event(event)
+            self.profiler.mark('events')
 
             # Update
-            self.bee_timer.update()
-            self.all_sprites.update(dt)
-            self.collision()
-
-            # Draw
+            for dt in self.simulation.steps(frame_time):
+                scheduler.update()
+                self.profiler.mark('timers', step = True)
+                self.all_sprites.snapshot()
+                self.all_sprites.update(dt)
+                self.bullet_sprites.expire(dt)
+                self.profiler.mark('update', step = True)
+                self.collision()
+                self.profiler.mark('collision', step = True)
+            self.profiler.end_steps()
+
+            # Draw, blended between the last two simulation steps
+            alpha = self.simulation.alpha
             self.display_surface.fill(BG_COLOR)
-            self.all_sprites.draw(self.player.rect.center)
+            self.all_sprites.draw(self.all_sprites.interpolated_center(self.player, alpha), alpha)
+            self.profiler.draw(self.display_surface)
+            self.profiler.mark('draw')
             pygame.display.update()
+            self.profiler.mark('display')
 
         pygame.quit()
 
@@ -0,0 +1,246 @@
+from settings import * 
+from os.path import dirname, normpath, relpath, splitext, getmtime, getsize
+from hashlib import blake2b
+from array import array
+from glob import glob
+import xml.etree.ElementTree as ElementTree
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b'SRMC'
+VERSION = 2
+# magic, version, little endian arrays, source fingerprint, map width, height, tile width, tile height
+HEADER = struct.Struct('<4sBB8sHHHH')
+# first gid, tile width, tile height, spacing, margin, columns
+TILESET = struct.Struct('<IHHHHH')
+# x, y, width, height, each after the object's name string
+OBJECT = struct.Struct('<dddd')
+COUNT = struct.Struct('<H')
+LENGTH = struct.Struct('<I')
+FLIP_X, FLIP_Y, FLIP_DIAGONAL = 1 << 31, 1 << 30, 1 << 29
+GID_MASK = 0x1FFFFFFF
+
+def cache_path(tmx_path):
+    return splitext(tmx_path)[0] + '.tmxc'
+
+def fingerprint(folder, sources):
+    digest = blake2b(digest_size = 8)
+    for source in sources:
+        path = join(folder, source)
+        try:
+            digest.update(f'{source}:{getmtime(path)}:{getsize(path)};'.encode())
+        except OSError:
+            digest.update(f'{source}:missing;'.encode())
+    return digest.digest()
+
+def relative(path, folder):
+    # sources are stored relative to the map so the cache survives moving the project
+    try:
+        return relpath(path, folder)
+    except ValueError:
+        return path
+
+# compiling
+
+def read_tileset(element, folder, sources):
+    firstgid = int(element.get('firstgid'))
+    if element.get('source'):
+        tsx_path = normpath(join(folder, element.get('source')))
+        sources.append(tsx_path)
+        element, folder = ElementTree.parse(tsx_path).getroot(), dirname(tsx_path)
+
+    image_path = normpath(join(folder, element.find('image').get('source')))
+    sources.append(image_path)
+    numbers = [int(element.get(name, 0)) for name in ('tilewidth', 'tileheight', 'spacing', 'margin', 'columns')]
+    return (firstgid, *numbers), image_path
+
+def read_layer(element, path):
+    data = element.find('data')
+    if data.get('encoding') != 'csv' or data.get('compression'):
+        raise ValueError(f'{path}: layer {element.get("name")} must be saved as uncompressed csv')
+    return array('I', (int(gid) for gid in data.text.replace('\n', '').split(',') if gid))
+
+def pack_string(text):
+    data = text.encode()
+    return COUNT.pack(len(data)) + data
+
+def pack_array(out, values):
+    # length first, then the items aligned so they can be viewed in place straight from the memory map
+    out.extend(bytes(-len(out) % 4) + LENGTH.pack(len(values)))
+    out.extend(bytes(-len(out) % values.itemsize))
+    out.extend(values.tobytes())
+
+def compile_map(tmx_path):
+    tmx_path = normpath(tmx_path)
+    folder = dirname(tmx_path)
+    root = ElementTree.parse(tmx_path).getroot()
+    sources = [tmx_path]
+
+    tilesets = [read_tileset(element, folder, sources) for element in root.iter('tileset')]
+    layers = [(element.get('name'), read_layer(element, tmx_path)) for element in root.iter('layer')]
+    groups = [(element.get('name'), [
+        (obj.get('name') or '', *(float(obj.get(name, 0)) for name in ('x', 'y', 'width', 'height')))
+        for obj in element.iter('object')
+    ]) for element in root.iter('objectgroup')]
+
+    sources = [relative(source, folder) for source in sources]
+    width, height = int(root.get('width')), int(root.get('height'))
+    out = bytearray(HEADER.pack(
+        MAGIC, VERSION, sys.byteorder == 'little', fingerprint(folder, sources),
+        width, height, int(root.get('tilewidth')), int(root.get('tileheight'))))
+
+    out += COUNT.pack(len(sources))
+    for source in sources:
+        out += pack_string(source)
+
+    out += COUNT.pack(len(tilesets))
+    for numbers, image_path in tilesets:
+        out += TILESET.pack(*numbers) + pack_string(relative(image_path, folder))
+
+    out += COUNT.pack(len(layers))
+    for name, gids in layers:
+        out += pack_string(name)
+        pack_array(out, gids)
+
+    out += COUNT.pack(len(groups))
+    for name, objects in groups:
+        out += pack_string(name) + COUNT.pack(len(objects))
+        for obj_name, *numbers in objects:
+            out += pack_string(obj_name) + OBJECT.pack(*numbers)
+
+    # write next to the cache and swap it in, so a half written file is never picked up
+    temp_path = cache_path(tmx_path) + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(out)
+    os.replace(temp_path, cache_path(tmx_path))
+
+# loading
+
+class MapObject:
+    def __init__(self, name, x, y, width, height):
+        self.name, self.x, self.y, self.width, self.height = name, x, y, width, height
+
+class TileLayer:
+    def __init__(self, name, width, gids, images):
+        self.name, self.width, self.gids, self.images = name, width, gids, images
+
+    def tiles(self):
+        for index, gid in enumerate(self.gids):
+            if gid:
+                yield index % self.width, index // self.width, self.images.get(gid)
+
+class ObjectGroup(list):
+    def __init__(self, name, objects):
+        super().__init__(objects)
+        self.name = name
+
+class CompiledMap:
+    def __init__(self, path, mapping):
+        self.mapping = mapping
+        self.data = memoryview(mapping)
+        self.folder = dirname(path)
+        self.offset = 0
+
+        magic, version, little, self.fingerprint, self.width, self.height, self.tilewidth, self.tileheight = self.read(HEADER)
+        if magic != MAGIC or version != VERSION or little != (sys.byteorder == 'little'):
+            raise ValueError(f'{path} is not a version {VERSION} map cache for this machine')
+
+        self.sources = [self.read_string() for _ in range(self.read_count())]
+        self.images = TileImages(self.folder, [(*self.read(TILESET), self.read_string()) for _ in range(self.read_count())])
+        self.layers = {}
+        for _ in range(self.read_count()):
+            name = self.read_string()
+            self.layers[name] = TileLayer(name, self.width, self.read_array('I'), self.images)
+        for _ in range(self.read_count()):
+            name = self.read_string()
+            self.layers[name] = ObjectGroup(name, [MapObject(self.read_string(), *self.read(OBJECT)) for _ in range(self.read_count())])
+
+    def read(self, layout):
+        values = layout.unpack_from(self.data, self.offset)
+        self.offset += layout.size
+        return values
+
+    def read_count(self):
+        return self.read(COUNT)[0]
+
+    def read_string(self):
+        length = self.read_count()
+        self.offset += length
+        return bytes(self.data[self.offset - length:self.offset]).decode()
+
+    def read_array(self, typecode):
+        size = struct.calcsize(typecode)
+        self.offset += -self.offset % 4
+        length = self.read(LENGTH)[0]
+        self.offset += -self.offset % size
+        view = self.data[self.offset:self.offset + length * size].cast(typecode)
+        self.offset += length * size
+        return view
+
+    def close(self):
+        # every view has to go before the mapping, windows cannot delete or replace a mapped file
+        for layer in self.layers.values():
+            if isinstance(layer, TileLayer):
+                layer.gids.release()
+        self.data.release()
+        self.mapping.close()
+
+    def is_stale(self):
+        return fingerprint(self.folder, self.sources) != self.fingerprint
+
+    def get_layer_by_name(self, name):
+        return self.layers[name]
+
+    def get_tile_image(self, gid):
+        return self.images.get(gid)
+
+class TileImages:
+    def __init__(self, folder, tilesets):
+        self.folder = folder
+        self.tilesets = sorted(tilesets, reverse = True)
+        self.surfaces = {}
+        self.images = {}
+
+    def get(self, gid):
+        if gid not in self.images:
+            tile = gid & GID_MASK
+            firstgid, tilewidth, tileheight, spacing, margin, columns, image_path = next(
+                tileset for tileset in self.tilesets if tileset[0] <= tile)
+            if image_path not in self.surfaces:
+                self.surfaces[image_path] = pygame.image.load(join(self.folder, image_path)).convert_alpha()
+
+            index = tile - firstgid
+            x = margin + (index % columns) * (tilewidth + spacing)
+            y = margin + (index // columns) * (tileheight + spacing)
+            image = self.surfaces[image_path].subsurface((x, y, tilewidth, tileheight))
+            if gid & FLIP_DIAGONAL:
+                image = pygame.transform.flip(pygame.transform.rotate(image, 90), False, True)
+            if gid & (FLIP_X | FLIP_Y):
+                image = pygame.transform.flip(image, bool(gid & FLIP_X), bool(gid & FLIP_Y))
+            self.images[gid] = image
+        return self.images[gid]
+
+def open_cache(tmx_path):
+    with open(cache_path(tmx_path), 'rb') as file:
+        data = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+    return CompiledMap(tmx_path, data)
+
+def load_map(tmx_path):
+    # compiled on first use and again whenever the map, tileset or tileset image changes
+    try:
+        tiled_map = open_cache(tmx_path)
+        if not tiled_map.is_stale():
+            return tiled_map
+        # drop the stale mapping before the file is replaced
+        tiled_map.close()
+    except (OSError, ValueError, struct.error):
+        pass
+    compile_map(tmx_path)
+    return open_cache(tmx_path)
+
+if __name__ == '__main__':
+    for tmx_path in sorted(glob(join(BASE_DIR, 'data', 'maps', '*.tmx'))):
+        compile_map(tmx_path)
+        print(f'{tmx_path} -> {cache_path(tmx_path)} ({getsize(cache_path(tmx_path))} bytes)')
@@ -0,0 +1,28 @@
+from settings import * 
+
+class Pool:
+    def __init__(self, sprite_type, size = POOL_SIZE):
+        self.sprite_type = sprite_type
+        self.size = size
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    def spawn(self, *args, **kwargs):
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args, **kwargs)
+            self.reused += 1
+        else:
+            sprite = self.sprite_type(*args, **kwargs)
+            sprite.pool = self
+            self.created += 1
+        return sprite
+
+    def release(self, sprite):
+        if len(self.free) < self.size:
+            self.free.append(sprite)
+
+    @property
+    def stats(self):
+        return {'created': self.created, 'reused': self.reused, 'free': len(self.free)}
@@ -0,0 +1,112 @@
+from settings import * 
+from collections import deque
+from time import perf_counter
+from hud import get_font
+import json
+
+# phases run once per fixed step, recorded as one total per frame
+STEP_PHASES = ('timers', 'update', 'collision')
+
+class FrameProfiler:
+    def __init__(self, history = PROFILER_HISTORY):
+        self.frame_times = deque(maxlen = history)
+        self.phase_times = {}
+        self.trace = deque(maxlen = history * 8)
+        self.history = history
+        self.show = False
+        # name -> callable returning {'p50': ms, ...} or None, shown under the phases
+        self.gauges = {}
+
+        self.origin = perf_counter()
+        self.frame_start = None
+        self.last_mark = None
+        self.frame = 0
+        self.steps = {}
+
+    def begin(self):
+        now = perf_counter()
+        # the frame time is the full period between two frames, tick wait included
+        if self.frame_start is not None:
+            self.frame_times.append((now - self.frame_start) * 1000)
+            self.frame += 1
+        self.frame_start = self.last_mark = now
+
+    def mark(self, phase, step = False):
+        # the trace keeps every step, the phase history only gets the frame total from end_steps
+        now = perf_counter()
+        duration = now - self.last_mark
+        if step:
+            self.steps[phase] = self.steps.get(phase, 0) + duration
+        else:
+            self.phase_times.setdefault(phase, deque(maxlen = self.history)).append(duration * 1000)
+        self.trace.append({
+            'name': phase, 'ph': 'X', 'pid': 0, 'tid': 0,
+            'ts': (self.last_mark - self.origin) * 1e6, 'dur': duration * 1e6,
+            'args': {'frame': self.frame},
+        })
+        self.last_mark = now
+
+    def end_steps(self):
+        # frames without a step count as 0 so catch-up frames stand out
+        for phase in STEP_PHASES:
+            self.phase_times.setdefault(phase, deque(maxlen = self.history)).append(self.steps.pop(phase, 0) * 1000)
+
+    def percentiles(self, values = None, points = (50, 95, 99)):
+        values = sorted(self.frame_times if values is None else values)
+        if not values:
+            return {point: 0 for point in points}
+        return {point: values[min(len(values) - 1, int(len(values) * point / 100))] for point in points}
+
+    def histogram(self, bucket_ms = 2):
+        buckets = {}
+        for frame_time in self.frame_times:
+            bucket = int(frame_time // bucket_ms) * bucket_ms
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+        return dict(sorted(buckets.items()))
+
+    def summary(self):
+        summary = {
+            'frames': len(self.frame_times),
+            'frame_ms': self.percentiles(),
+            'phase_ms': {phase: sum(times) / len(times) for phase, times in self.phase_times.items()},
+        }
+        if self.gauges:
+            summary['gauges'] = {name: read() for name, read in self.gauges.items()}
+        return summary
+
+    def export_trace(self, path = PROFILER_TRACE_PATH):
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': list(self.trace), 'displayTimeUnit': 'ms'}, file)
+        return path
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == PROFILER_TOGGLE_KEY:
+                self.show = not self.show
+            if event.key == PROFILER_EXPORT_KEY:
+                print('frame trace written to', self.export_trace())
+
+    def draw(self, surface):
+        if not self.show:
+            return
+        summary = self.summary()
+        lines = ['frame  p50 {:.1f}  p95 {:.1f}  p99 {:.1f} ms'.format(*summary['frame_ms'].values())]
+        lines += [f'{phase:<10} {ms:.2f} ms' for phase, ms in summary['phase_ms'].items()]
+        lines += ['{}  p50 {:.1f}  p95 {:.1f}  p99 {:.1f} ms'.format(name, *values.values())
+            for name, values in summary.get('gauges', {}).items() if values]
+
+        panel = pygame.Surface((300, 20 * len(lines) + 70), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        # the numbers change every frame, so only the font is kept
+        for i, line in enumerate(lines):
+            panel.blit(get_font(22).render(line, True, 'white'), (10, 8 + i * 20))
+
+        # recent frame times as bars, the line marks the frame budget
+        graph_top, graph_height = panel.get_height() - 55, 45
+        budget = 1000 / FRAMERATE
+        for x, frame_time in enumerate(list(self.frame_times)[-280:]):
+            height = min(graph_height, frame_time / (budget * 2) * graph_height)
+            color = (120, 220, 120) if frame_time <= budget * 1.05 else (240, 90, 90)
+            pygame.draw.line(panel, color, (10 + x, graph_top + graph_height), (10 + x, graph_top + graph_height - height))
+        pygame.draw.line(panel, 'white', (10, graph_top + graph_height / 2), (290, graph_top + graph_height / 2))
+        surface.blit(panel, (WINDOW_WIDTH - panel.get_width() - 10, 50))
@@ -0,0 +1,112 @@
+from settings import * 
+from main import Game
+from headless import HeadlessGame, ScriptedKeys, print_report
+from random import seed, randrange
+from argparse import ArgumentParser
+from zlib import crc32
+import struct
+
+RECORDED_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_SPACE, pygame.K_s)
+MAGIC = b'SRRP'
+VERSION = 1
+# magic, version, random seed, simulation rate, step count, state checksum
+HEADER = struct.Struct('<4sBIHII')
+# key mask, number of steps it was held for
+RUN = struct.Struct('<BH')
+
+def encode(keys):
+    mask = 0
+    for bit, key in enumerate(RECORDED_KEYS):
+        if keys[key]:
+            mask |= 1 << bit
+    return mask
+
+def decode(mask):
+    return ScriptedKeys({key for bit, key in enumerate(RECORDED_KEYS) if mask >> bit & 1})
+
+def state_checksum(game):
+    # cheap fingerprint of the world to tell whether a replay ended where the recording did
+    state = [(type(sprite).__name__, round(sprite.rect.x, 3), round(sprite.rect.y, 3)) for sprite in game.all_sprites]
+    return crc32(repr((state, game.entity_counts())).encode())
+
+class InputRecorder:
+    def __init__(self, source, random_seed):
+        self.source = source
+        self.random_seed = random_seed
+        self.steps = bytearray()
+
+    def __call__(self):
+        keys = self.source()
+        self.steps.append(encode(keys))
+        return keys
+
+    def save(self, path, checksum = 0):
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.random_seed, SIMULATION_RATE, len(self.steps), checksum))
+            start = 0
+            while start < len(self.steps):
+                end = start
+                while end < len(self.steps) and self.steps[end] == self.steps[start] and end - start < 0xFFFF:
+                    end += 1
+                file.write(RUN.pack(self.steps[start], end - start))
+                start = end
+
+class InputReplay:
+    def __init__(self, steps):
+        self.steps = steps
+        self.index = 0
+
+    def __call__(self):
+        mask = self.steps[self.index] if self.index < len(self.steps) else 0
+        self.index += 1
+        return decode(mask)
+
+def load(path):
+    with open(path, 'rb') as file:
+        data = file.read()
+    magic, version, random_seed, rate, step_count, checksum = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'{path} is not a version {VERSION} input recording')
+    if rate != SIMULATION_RATE:
+        raise ValueError(f'{path} was recorded at {rate} steps per second, the game runs at {SIMULATION_RATE}')
+
+    steps = bytearray()
+    for mask, count in RUN.iter_unpack(data[HEADER.size:]):
+        steps.extend(bytes([mask]) * count)
+    if len(steps) != step_count:
+        raise ValueError(f'{path} is truncated, expected {step_count} steps and found {len(steps)}')
+    return random_seed, steps, checksum
+
+def record(path):
+    random_seed = randrange(2 ** 32)
+    seed(random_seed)
+    game = Game()
+    recorder = InputRecorder(game.player.input_source, random_seed)
+    game.player.input_source = recorder
+    try:
+        game.run()
+    finally:
+        recorder.save(path, state_checksum(game))
+    print(f'recorded {len(recorder.steps)} steps to {path}')
+
+def replay(path):
+    random_seed, steps, checksum = load(path)
+    game = HeadlessGame(dt = 1 / SIMULATION_RATE, random_seed = random_seed)
+    game.player.input_source = InputReplay(steps)
+    report = game.simulate(len(steps))
+    report['matches_recording'] = state_checksum(game) == checksum
+    return report
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description = 'Record a session to a compact input log or replay one headlessly at full speed.')
+    parser.add_argument('mode', choices = ('record', 'replay'))
+    parser.add_argument('path')
+    args = parser.parse_args()
+
+    if args.mode == 'record':
+        record(args.path)
+    else:
+        report = replay(args.path)
+        print_report(report)
+        print('  state matches recording' if report['matches_recording'] else '  state diverged from recording')
+        pygame.quit()
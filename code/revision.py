@@ -0,0 +1,9 @@
+import subprocess
+from settings import *
+
+def git_commit():
+    # benchmark results are stamped with the commit they ran on, blank outside a checkout
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output = True, text = True, cwd = BASE_DIR).stdout.strip()
+    except OSError:
+        return ''
@@ -1,9 +1,79 @@
 import pygame
+import sys
+import importlib.util
 from os import walk
-from os.path import join
-from pytmx.util_pygame import load_pygame
+from os.path import join, dirname, abspath
+
+BASE_DIR = dirname(dirname(abspath(__file__)))
 
 WINDOW_WIDTH, WINDOW_HEIGHT = 1280,720
 TILE_SIZE = 64 
 FRAMERATE = 60
+SIMULATION_RATE = 60
+MAX_SIMULATION_STEPS = 5
 BG_COLOR = '#fcdfcd'
+SPATIAL_CELL_SIZE = TILE_SIZE * 4
+BULLET_LIFETIME = 3
+# dead sprites kept per pool for reuse, a burst beyond this is left to the garbage collector
+POOL_SIZE = 256
+
+# startup, checked by startup.py
+STARTUP_BUDGET_MS = 1500
+
+def lazy_import(name):
+    # the module body only runs on first attribute access
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f'No module named {name!r}', name = name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+def load_pygame(*args, **kwargs):
+    # pytmx is only needed by the scripts that parse .tmx files directly
+    from pytmx.util_pygame import load_pygame
+    return load_pygame(*args, **kwargs)
+
+# sprite frames come from the packed atlas in data/graphics
+USE_ATLAS = True
+
+# images, sounds and maps kept in memory across restarts and level switches
+ASSET_CACHE_BUDGET = 256 * 1024 * 1024
+ASSET_LOADER_THREADS = 4
+
+# static tile layers
+BAKE_STATIC_TILES = True
+CHUNK_TILES = 16
+CHUNK_CACHE_SIZE = 12
+
+# hud, rendered strings kept around until they fall out of the cache
+TEXT_CACHE_SIZE = 64
+
+# hand tracking, runs beside the game loop
+CAMERA_INDEX = 0
+CAMERA_RETRY = 1
+HAND_PREVIEW = True
+GESTURE_TIMEOUT = 0.25
+GESTURE_CHANNEL = 'superrabbitch_gestures'
+
+# still frames are not sent to the model, motion is the mean grey level change out of 255
+HAND_ADAPTIVE = True
+HAND_MOTION_THRESHOLD = 2.0
+
+# launcher, the tracker is kept off the cores the game loop runs on
+LAUNCHER_GAME_CORES = (0,)
+LAUNCHER_POLL_INTERVAL = 0.5
+LAUNCHER_REPORT_INTERVAL = 5
+LAUNCHER_MAX_RESTARTS = 5
+LAUNCHER_STOP_TIMEOUT = 3
+
+# profiler
+PROFILER_HISTORY = 600
+PROFILER_TOGGLE_KEY = pygame.K_F3
+PROFILER_EXPORT_KEY = pygame.K_F4
+PROFILER_TRACE_PATH = 'frame_trace.json'
@@ -0,0 +1,49 @@
+from settings import * 
+from math import floor
+
+class SpatialGrid:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.sprite_cells = {}
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        return floor(rect.left / size), floor(rect.top / size), floor(rect.right / size), floor(rect.bottom / size)
+
+    @staticmethod
+    def cells_in(bounds):
+        left, top, right, bottom = bounds
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                yield x, y
+
+    def insert(self, sprite):
+        bounds = self.cell_range(sprite.rect)
+        self.sprite_cells[sprite] = bounds
+        for cell in self.cells_in(bounds):
+            self.cells.setdefault(cell, set()).add(sprite)
+
+    def remove(self, sprite):
+        bounds = self.sprite_cells.pop(sprite, None)
+        if bounds is None:
+            return
+        for cell in self.cells_in(bounds):
+            bucket = self.cells[cell]
+            bucket.discard(sprite)
+            if not bucket:
+                del self.cells[cell]
+
+    def move(self, sprite):
+        # only touch the buckets when the sprite crosses a cell border
+        if self.sprite_cells.get(sprite) != self.cell_range(sprite.rect):
+            self.remove(sprite)
+            self.insert(sprite)
+
+    def query(self, rect):
+        found = set()
+        for cell in self.cells_in(self.cell_range(rect)):
+            bucket = self.cells.get(cell)
+            if bucket:
+                found.update(bucket)
+        return found
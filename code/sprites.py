@@ -1,24 +1,48 @@
 from settings import * 
-from timer import Timer
+from timer import Timer, scheduler
+from support import get_mask, get_flipped
 from math import sin
 from random import randint
 
 class Sprite(pygame.sprite.Sprite):
+    pool = None
+
     def __init__(self, pos, surf, groups):
         super().__init__(groups)
         self.image = surf 
         self.rect = self.image.get_frect(topleft = pos)
 
+    def reset(self, pos, surf, groups):
+        # pooled sprites are set up again in place, the rect is reused instead of allocated
+        self.image = surf
+        self.rect.size = surf.get_size()
+        self.rect.topleft = pos
+        self.add(groups)
+
+    def kill(self):
+        # pooled sprites go back to their free list instead of being thrown away
+        if self.pool and self.alive():
+            self.pool.release(self)
+        super().kill()
+
+    @property
+    def mask(self):
+        return get_mask(self.image)
+
 class Bullet(Sprite):
     def __init__(self, surf, pos, direction, groups):
         super().__init__(pos, surf, groups)
         
         # adjustment 
-        self.image = pygame.transform.flip(self.image, direction == -1, False)
+        self.image = get_flipped(self.image) if direction == -1 else self.image
 
         # movement
         self.direction = direction
         self.speed = 850
+
+    def reset(self, surf, pos, direction, groups):
+        super().reset(pos, get_flipped(surf) if direction == -1 else surf, groups)
+        self.direction = direction
     
     def update(self, dt):
         self.rect.x += self.direction * self.speed * dt
@@ -32,13 +56,23 @@ class Fire(Sprite):
         self.y_offset = pygame.Vector2(0,8)
         if self.player.flip:
             self.rect.midright = self.player.rect.midleft + self.y_offset
-            self.image = pygame.transform.flip(self.image, True, False)
+            self.image = get_flipped(self.image)
         else:
             self.rect.midleft = self.player.rect.midright + self.y_offset
 
-    def update(self, _):
-        self.timer.update()
+    def reset(self, surf, pos, groups, player):
+        super().reset(pos, get_flipped(surf) if player.flip else surf, groups)
+        self.player = player
+        self.flip = player.flip
+        self.timer.activate()
+        # placed next to the player like a fresh one
+        self.update(0)
 
+    def kill(self):
+        self.timer.cancel()
+        super().kill()
+
+    def update(self, _):
         if self.player.flip:
             self.rect.midright = self.player.rect.midleft + self.y_offset
         else:
@@ -52,6 +86,10 @@ class AnimatedSprite(Sprite):
         self.frames, self.frame_index, self.animation_speed = frames, 0, 10
         super().__init__(pos, self.frames[self.frame_index], groups)
 
+    def reset(self, frames, pos, groups):
+        self.frames, self.frame_index, self.animation_speed = frames, 0, 10
+        super().reset(pos, self.frames[self.frame_index], groups)
+
     def animate(self, dt):
         self.frame_index += self.animation_speed * dt
         self.image = self.frames[int(self.frame_index) % len(self.frames)]
@@ -64,11 +102,14 @@ class Enemy(AnimatedSprite):
     def destroy(self):
         self.death_timer.activate()
         self.animation_speed = 0
-        self.image = pygame.mask.from_surface(self.image).to_surface()
+        self.image = get_mask(self.image).to_surface()
         self.image.set_colorkey('black')
 
+    def kill(self):
+        self.death_timer.cancel()
+        super().kill()
+
     def update(self, dt):
-        self.death_timer.update()
         if not self.death_timer:
             self.move(dt)
             self.animate(dt)
@@ -81,9 +122,15 @@ class Bee(Enemy):
         self.amplitude = randint(500,600)
         self.frequency = randint(300,600)
 
+    def reset(self, frames, pos, groups, speed):
+        super().reset(frames, pos, groups)
+        self.speed = speed
+        self.amplitude = randint(500,600)
+        self.frequency = randint(300,600)
+
     def move(self, dt):
         self.rect.x -= self.speed * dt
-        self.rect.y += sin(pygame.time.get_ticks() / self.frequency) * self.amplitude * dt
+        self.rect.y += sin(scheduler.clock() / self.frequency) * self.amplitude * dt
     
     def constraint(self):
         if self.rect.right <= 0:
@@ -91,7 +138,8 @@ class Bee(Enemy):
 
 class Worm(Enemy):
     def __init__(self, frames, rect, groups):
-        super().__init__(frames, rect.topleft, groups)
+        super().__init__(frames[False], rect.topleft, groups)
+        self.facing_frames = frames
         self.rect.bottomleft = rect.bottomleft
         self.main_rect = rect
         self.speed = randint(160,200)
@@ -103,11 +151,12 @@ class Worm(Enemy):
     def constraint(self):
         if not self.main_rect.contains(self.rect):
             self.direction *= -1
-            self.frames = [pygame.transform.flip(surf, True, False) for surf in self.frames]
+            self.frames = self.facing_frames[self.direction < 0]
 
 class Player(AnimatedSprite):
     def __init__(self, pos, groups, collision_sprites, frames, create_bullet):
-        super().__init__(frames, pos, groups)
+        super().__init__(frames[False], pos, groups)
+        self.facing_frames = frames
         self.flip = False
         self.create_bullet = create_bullet
     
@@ -118,11 +167,14 @@ class Player(AnimatedSprite):
         self.gravity = 50
         self.on_floor = False
 
+        # input, swapped out for scripted keys when running headless
+        self.input_source = pygame.key.get_pressed
+
         # timer
         self.shoot_timer = Timer(200)
 
     def input(self):
-        keys = pygame.key.get_pressed()
+        keys = self.input_source()
         self.direction.x = int(keys[pygame.K_RIGHT]) - int(keys[pygame.K_LEFT])
         if keys[pygame.K_SPACE] and self.on_floor:
             self.direction.y = -20
@@ -142,7 +194,7 @@ class Player(AnimatedSprite):
         self.collision('vertical')
 
     def collision(self, direction):
-        for sprite in self.collision_sprites:
+        for sprite in self.collision_sprites.near(self.rect):
             if sprite.rect.colliderect(self.rect):
                 if direction == 'horizontal':
                     if self.direction.x > 0: self.rect.right = sprite.rect.left
@@ -154,7 +206,7 @@ class Player(AnimatedSprite):
 
     def check_floor(self):
         bottom_rect = pygame.FRect((0,0), (self.rect.width, 2)).move_to(midtop = self.rect.midbottom)
-        self.on_floor = True if bottom_rect.collidelist([sprite.rect for sprite in self.collision_sprites]) >= 0 else False
+        self.on_floor = True if bottom_rect.collidelist([sprite.rect for sprite in self.collision_sprites.near(bottom_rect)]) >= 0 else False
 
     def animate(self, dt):
         if self.direction.x:
@@ -164,11 +216,9 @@ class Player(AnimatedSprite):
             self.frame_index = 0
 
         self.frame_index = 1 if not self.on_floor else self.frame_index
-        self.image = self.frames[int(self.frame_index) % len(self.frames)]
-        self.image = pygame.transform.flip(self.image, self.flip, False)
+        self.image = self.facing_frames[self.flip][int(self.frame_index) % len(self.frames)]
 
     def update(self, dt):
-        self.shoot_timer.update()
         self.check_floor()
         self.input()
         self.move(dt)
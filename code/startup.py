@@ -0,0 +1,99 @@
+import json
+import subprocess
+import sys
+from settings import *
+from argparse import ArgumentParser
+from time import time
+
+# top level package -> subsystem, anything else counts as the standard library
+SUBSYSTEMS = {
+    'pygame': 'pygame',
+    'pytmx': 'maps',
+    'mediapipe': 'hand tracking',
+    'cv2': 'hand tracking',
+    'numpy': 'hand tracking',
+    'pynput': 'hand tracking',
+}
+OPTIONAL = ('pytmx', 'mediapipe', 'cv2', 'numpy', 'pynput')
+CODE_DIR = dirname(abspath(__file__))
+
+# runs in a fresh interpreter with -X importtime, the timeline goes to stdout as json
+CHILD = '''
+import sys, json
+from time import perf_counter, time
+launched = time()
+start = perf_counter()
+import {module}
+imported = perf_counter()
+from headless import HeadlessGame
+game = HeadlessGame()
+ready = perf_counter()
+game.step({{phase: 0 for phase in ('timers', 'update', 'collision', 'draw')}})
+first_frame = perf_counter()
+print(json.dumps({{'launched': launched, 'imports': imported - start, 'load': ready - imported, 'first_frame': first_frame - ready, 'files': {{name: getattr(module, '__file__', None) for name, module in list(sys.modules.items())}}}}))
+'''
+
+def subsystem(module, files):
+    # anything loaded from the code folder is the game, whatever its name
+    path = files.get(module)
+    if path and abspath(path).startswith(join(CODE_DIR, '')):
+        return 'game'
+    return SUBSYSTEMS.get(module.split('.')[0], 'stdlib')
+
+def parse_importtime(lines):
+    # "import time: self [us] | cumulative | imported package", nested imports are indented
+    modules = []
+    for line in lines:
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        modules.append((name.strip(), int(own) / 1000))
+    return modules
+
+def audit(module = 'main'):
+    launch = time()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD.format(module = module)],
+        cwd = dirname(abspath(__file__)), capture_output = True, text = True)
+    if result.returncode:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+        raise RuntimeError(errors[-1] if errors else f'{module} exited with {result.returncode}')
+
+    timeline = json.loads(result.stdout.strip().splitlines()[-1])
+    modules = parse_importtime(result.stderr.splitlines())
+    subsystems = {}
+    for name, ms in modules:
+        group = subsystem(name, timeline['files'])
+        subsystems[group] = subsystems.get(group, 0) + ms
+    return {
+        'phases_ms': {'interpreter': (timeline['launched'] - launch) * 1000,
+            **{phase: timeline[phase] * 1000 for phase in ('imports', 'load', 'first_frame')}},
+        'subsystems_ms': dict(sorted(subsystems.items(), key = lambda item: -item[1])),
+        'slowest': sorted(modules, key = lambda item: -item[1]),
+        'loaded': [package for package in OPTIONAL if package in timeline['files']],
+    }
+
+def print_audit(report, budget, top):
+    total = sum(report['phases_ms'].values())
+    print(f'launch to first frame {total:.1f} ms, budget {budget} ms')
+    for phase, ms in report['phases_ms'].items():
+        print(f'  {phase:<12} {ms:8.1f} ms')
+    print('imports by subsystem')
+    for name, ms in report['subsystems_ms'].items():
+        print(f'  {name:<14} {ms:8.1f} ms')
+    print(f'slowest {top} modules')
+    for name, ms in report['slowest'][:top]:
+        print(f'  {name:<30} {ms:8.1f} ms')
+    print('optional packages loaded', report['loaded'] or 'none')
+    return total
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description = 'Time the imports per subsystem and the launch to the first frame.')
+    parser.add_argument('--module', default = 'main', help = 'module imported before the game starts')
+    parser.add_argument('--budget', type = float, default = STARTUP_BUDGET_MS, help = 'milliseconds from launch to first frame')
+    parser.add_argument('--top', type = int, default = 10)
+    args = parser.parse_args()
+
+    total = print_audit(audit(args.module), args.budget, args.top)
+    if total > args.budget:
+        print(f'over budget by {total - args.budget:.1f} ms')
+        sys.exit(1)
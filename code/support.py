@@ -1,21 +1,114 @@
 from settings import * 
+from weakref import WeakKeyDictionary
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from atlas import load_atlas, read_index, path_key, atlases, ATLAS_IMAGE
+from assets import cache, surface_size, sound_size
+from mapcache import load_map
+
+masks = WeakKeyDictionary()
+flipped_surfaces = WeakKeyDictionary()
+decoded = {}
+
+IMAGE_FORMATS = ('.png', '.jpg', '.bmp')
+AUDIO_FORMATS = ('.wav', '.ogg', '.mp3')
+
+def decode_jobs(folders):
+    # the atlas image itself is decoded with everything else, its index says which frames it holds
+    jobs, index, frames = [], None, {}
+    if USE_ATLAS:
+        if 'images' in atlases:
+            frames = atlases['images'].frames
+        else:
+            index = read_index()
+            frames = index['frames']
+            jobs.append((ATLAS_IMAGE, pygame.image.load))
+
+    for folder in folders:
+        for folder_path, _, file_names in walk(folder):
+            for file_name in file_names:
+                full_path = join(folder_path, file_name)
+                if full_path in decoded:
+                    continue
+                if file_name.endswith(IMAGE_FORMATS):
+                    # images already cached or packed into the atlas need no decoding
+                    if ('folder', folder_path) in cache or ('image', full_path, True) in cache or ('image', full_path, False) in cache:
+                        continue
+                    if path_key(full_path) in frames:
+                        continue
+                    jobs.append((full_path, pygame.image.load))
+                elif file_name.endswith(AUDIO_FORMATS) and ('sound', full_path) not in cache:
+                    jobs.append((full_path, pygame.mixer.Sound))
+    return jobs, index
+
+def preload(*folders, progress = None):
+    # decoding runs on worker threads, converting to the display format stays on the main thread
+    jobs, index = decode_jobs(folders)
+    with ThreadPoolExecutor(ASSET_LOADER_THREADS) as pool:
+        futures = {pool.submit(decode, full_path): full_path for full_path, decode in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            decoded[futures[future]] = future.result()
+            if progress:
+                progress(done, len(futures))
+    if index:
+        load_atlas(decoded.pop(ATLAS_IMAGE), index)
+
+def read(full_path, decode):
+    # files decoded ahead by preload are handed out once, anything else is decoded here
+    data = decoded.pop(full_path, None)
+    return data if data is not None else decode(full_path)
+
+def load_image(full_path):
+    # frames packed into the atlas come back as subsurfaces, anything else straight from disk
+    image = load_atlas().get(full_path) if USE_ATLAS else None
+    return image if image else read(full_path, pygame.image.load).convert_alpha()
 
 def import_image(*path, format = 'png', alpha = True):
     full_path = join(*path) + f'.{format}'
-    return pygame.image.load(full_path).convert_alpha() if alpha else pygame.image.load(full_path).convert()
+    load = (lambda: load_image(full_path)) if alpha else (lambda: read(full_path, pygame.image.load).convert())
+    return cache.get(('image', full_path, alpha), load, surface_size)
 
 def import_folder(*path):
-    frames = []
-    for folder_path, _, file_names in walk(join(*path)):
-        for file_name in sorted(file_names, key = lambda name: int(name.split('.')[0])):
-            full_path = join(folder_path, file_name)
-            frames.append(pygame.image.load(full_path).convert_alpha())
-    return frames
+    def load():
+        frames = []
+        for folder_path, _, file_names in walk(join(*path)):
+            for file_name in sorted(file_names, key = lambda name: int(name.split('.')[0])):
+                full_path = join(folder_path, file_name)
+                frames.append(load_image(full_path))
+        return frames
+    # a copy, so callers can rearrange their frame list without touching the cached one
+    return list(cache.get(('folder', join(*path)), load, lambda frames: sum(map(surface_size, frames))))
+
+def flip_frames(frames):
+    # both facings up front, keyed by the sprites' flip flag
+    return {False: frames, True: [get_flipped(surf) for surf in frames]}
 
 def audio_importer(*path):
     audio_dict = {}
     for folder_path, _, file_names in walk(join(*path)):
         for file_name in file_names:
             full_path = join(folder_path, file_name)
-            audio_dict[file_name.split('.')[0]] = pygame.mixer.Sound(full_path)
-    return audio_dict
\ No newline at end of file
+            audio_dict[file_name.split('.')[0]] = cache.get(('sound', full_path), lambda: read(full_path, pygame.mixer.Sound), sound_size)
+    return audio_dict
+
+def import_map(path):
+    # sized by the compiled map data, tile images are subsurfaces of the tileset
+    return cache.get(('map', path), lambda: load_map(path), lambda tiled_map: len(tiled_map.data))
+
+def unload_map(path):
+    # closes the mapping too, so the .tmxc file can be deleted or rebuilt
+    tiled_map = cache.discard(('map', path))
+    if tiled_map:
+        tiled_map.close()
+
+def get_flipped(surf):
+    flipped = flipped_surfaces.get(surf)
+    if flipped is None:
+        flipped = flipped_surfaces[surf] = pygame.transform.flip(surf, True, False)
+    return flipped
+
+def get_mask(surf):
+    # one mask per surface, dropped together with the surface
+    mask = masks.get(surf)
+    if mask is None:
+        mask = masks[surf] = pygame.mask.from_surface(surf)
+    return mask
\ No newline at end of file
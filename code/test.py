@@ -1,12 +1,12 @@
 import pygame
 from settings import *
 from sprites import *
-from groups import AllSprites
+from groups import AllSprites, CollisionSprites
 from support import *
 from timer import Timer
 from random import randint
-import mediapipe as mp
-import cv2
+from tracking import HandTracker
+from gestures import GestureKeys
 
 
 class Game:
@@ -19,7 +19,7 @@ class Game:
 
         # Groups
         self.all_sprites = AllSprites()
-        self.collision_sprites = pygame.sprite.Group()
+        self.collision_sprites = CollisionSprites()
         self.bullet_sprites = pygame.sprite.Group()
         self.enemy_sprites = pygame.sprite.Group()
 
@@ -30,10 +30,10 @@ class Game:
         # Timers
         self.bee_timer = Timer(100, func=self.create_bee, autostart=True, repeat=True)
 
-        # Mediapipe setup
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(static_image_mode=False, max_num_hands=1, min_detection_confidence=0.5)
-        self.cap = cv2.VideoCapture(0)
+        # Hand tracking runs on its own threads, the player reads the latest gesture with the keyboard
+        self.tracker = HandTracker()
+        self.tracker.start()
+        self.player.input_source = lambda: GestureKeys(self.tracker.gesture(), pygame.key.get_pressed())
 
     def create_bee(self):
         Bee(
@@ -51,11 +51,11 @@ class Game:
 
     def load_assets(self):
         # Absolute paths for graphics
-        self.player_frames = import_folder(r'D:\Programming\Platform 4 finish\images\player')
+        self.player_frames = flip_frames(import_folder(r'D:\Programming\Platform 4 finish\images\player'))
         self.bullet_surf = import_image(r'D:\Programming\Platform 4 finish\images\gun', 'bullet')
         self.fire_surf = import_image(r'D:\Programming\Platform 4 finish\images\gun', 'fire')
         self.bee_frames = import_folder(r'D:\Programming\Platform 4 finish\images\enemies\bee')
-        self.worm_frames = import_folder(r'D:\Programming\Platform 4 finish\images\enemies\worm')
+        self.worm_frames = flip_frames(import_folder(r'D:\Programming\Platform 4 finish\images\enemies\worm'))
 
         # Absolute path for sounds
         self.audio = audio_importer(r'D:\Programming\Platform 4 finish\audio')
@@ -98,30 +98,6 @@ class Game:
                 for sprite in sprite_collision:
                     sprite.destroy()
 
-    def process_hand_landmarks(self):
-        ret, frame = self.cap.read()
-        if not ret:
-            return
-
-        frame = cv2.flip(frame, 1)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = self.hands.process(rgb_frame)
-
-        if result.multi_hand_landmarks:
-            for hand_landmarks in result.multi_hand_landmarks:
-                # Get landmark positions
-                lm = hand_landmarks.landmark
-                if lm[8].y < lm[7].y and lm[12].y < lm[11].y:  # Jump condition
-                    self.player.jump()
-                elif lm[4].y < lm[3].y:  # Move left
-                    self.player.move_left()
-                elif lm[20].y < lm[19].y:  # Move right
-                    self.player.move_right()
-
-        cv2.imshow('Hand Tracking', frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            self.running = False
-
     def run(self):
         while self.running:
             dt = self.clock.tick(FRAMERATE) / 1000
@@ -130,8 +106,9 @@ class Game:
                 if event.type == pygame.QUIT:
                     self.running = False
 
-            # Process hand landmarks for movement
-            self.process_hand_landmarks()
+            # 'q' in the preview window quits as before
+            if self.tracker.quit_requested:
+                self.running = False
 
             # Update
             self.bee_timer.update()
@@ -144,8 +121,7 @@ class Game:
             pygame.display.update()
 
         pygame.quit()
-        self.cap.release()
-        cv2.destroyAllWindows()
+        self.tracker.stop()
 
 
 if __name__ == '__main__':
@@ -1,8 +1,9 @@
 import pygame  
 from settings import *  
 from sprites import *  
-from groups import AllSprites  
+from groups import AllSprites, CollisionSprites  
 from support import *  
+from hud import render_text  
 from timer import Timer  
 from random import randint  
 
@@ -20,7 +21,7 @@ class Game:
 
         # Groups  
         self.all_sprites = AllSprites()  
-        self.collision_sprites = pygame.sprite.Group()  
+        self.collision_sprites = CollisionSprites()  
         self.bullet_sprites = pygame.sprite.Group()  
         self.enemy_sprites = pygame.sprite.Group()  
 
@@ -47,11 +48,11 @@ class Game:
 
     def load_assets(self):  
         # Absolute paths for graphics  
-        self.player_frames = import_folder(r'D:\Programming\Platform 4 finish\images\player')  # Updated path  
+        self.player_frames = flip_frames(import_folder(r'D:\Programming\Platform 4 finish\images\player'))  # Updated path  
         self.bullet_surf = import_image(r'D:\Programming\Platform 4 finish\images\gun', 'bullet')  # Updated path  
         self.fire_surf = import_image(r'D:\Programming\Platform 4 finish\images\gun', 'fire')  # Updated path  
         self.bee_frames = import_folder(r'D:\Programming\Platform 4 finish\images\enemies\bee')  # Updated path  
-        self.worm_frames = import_folder(r'D:\Programming\Platform 4 finish\images\enemies\worm')  # Updated path  
+        self.worm_frames = flip_frames(import_folder(r'D:\Programming\Platform 4 finish\images\enemies\worm'))  # Updated path  
 
         # Absolute path for sounds  
         self.audio = audio_importer(r'D:\Programming\Platform 4 finish\audio')  # Updated path  
@@ -138,19 +139,16 @@ class Game:
         pygame.quit()  
 
     def display_score(self):  
-        font = pygame.font.Font(None, 36)  
-        score_surface = font.render(f'Score: {self.score}', True, (255, 255, 255))  
+        score_surface = render_text(f'Score: {self.score}', 36, (255, 255, 255))  
         self.display_surface.blit(score_surface, (10, 10))  # Display score at the top-left corner  
 
     def display_countdown(self, elapsed_time):  
         remaining_time = max(0, self.game_duration - int(elapsed_time))  
-        font = pygame.font.Font(None, 36)  
-        countdown_surface = font.render(f'Time: {remaining_time}', True, (255, 255, 255))  
+        countdown_surface = render_text(f'Time: {remaining_time}', 36, (255, 255, 255))  
         self.display_surface.blit(countdown_surface, (WINDOW_WIDTH - 100, 10))  # Display countdown at the top-right corner  
 
     def show_final_score(self):  
-        font = pygame.font.Font(None, 74)  
-        final_score_surface = font.render(f'Final Score: {self.score}', True, (255, 255, 255))  
+        final_score_surface = render_text(f'Final Score: {self.score}', 74, (255, 255, 255))  
         self.display_surface.fill((0, 0, 0))  # Fill the screen with black  
         self.display_surface.blit(final_score_surface, (WINDOW_WIDTH // 2 - final_score_surface.get_width() // 2, WINDOW_HEIGHT // 2))  
         pygame.display.update()  
@@ -165,12 +163,11 @@ class Game:
 
         while menu_active:  
             self.display_surface.fill((0, 0, 0))  
-            font = pygame.font.Font(None, 74)  
 
             # Display time selection options  
             for i, time_option in enumerate(time_options):  
                 color = (255, 255, 255) if i == time_selected else (150, 150, 150)  
-                text_surface = font.render(time_option, True, color)  
+                text_surface = render_text(time_option, 74, color)  
                 self.display_surface.blit(text_surface, (WINDOW_WIDTH // 2 - text_surface.get_width() // 2, WINDOW_HEIGHT // 2 - 50 + i * 100))  
 
             pygame.display.update()  
@@ -2,9 +2,14 @@
 import pygame
 from settings import * 
 from sprites import * 
-from groups import AllSprites 
+from groups import AllSprites, CollisionSprites, SpatialGroup, ProjectileSprites 
+from chunks import TileChunks 
 from support import * 
-from timer import Timer 
+from hud import render_text 
+from gestures import GestureReader 
+from timer import Timer, FixedStep, scheduler 
+from pool import Pool 
+from profiler import FrameProfiler 
 from random import randint 
 
 class Game: 
@@ -19,22 +24,33 @@ class Game:
         self.start_time = 0 
         self.game_duration = 60  # Default duration 
         self.mode = None  # Game mode
+        self.profiler = FrameProfiler()
+        self.gestures = GestureReader()
+        # camera to game loop latency on the profiler overlay, when hand_control.py is running
+        self.profiler.gauges['gesture'] = self.gestures.latency_ms
+
+        # Simulation runs in fixed steps on its own clock
+        self.simulation = FixedStep()
+        scheduler.clock = self.simulation.clock
 
         # Groups 
         self.all_sprites = AllSprites() 
-        self.collision_sprites = pygame.sprite.Group() 
-        self.bullet_sprites = pygame.sprite.Group() 
-        self.enemy_sprites = pygame.sprite.Group() 
+        self.collision_sprites = CollisionSprites() 
+        self.bullet_sprites = ProjectileSprites() 
+        self.enemy_sprites = SpatialGroup() 
+
+        # Pools 
+        self.pools = {'bee': Pool(Bee), 'bullet': Pool(Bullet), 'fire': Pool(Fire)} 
 
         # Load game 
-        self.load_assets() 
+        self.load_assets(self.draw_loading) 
         self.setup() 
 
         # Timers 
         self.bee_timer = Timer(100, func=self.create_bee, autostart=True, repeat=True) 
 
     def create_bee(self): 
-        Bee( 
+        self.pools['bee'].spawn( 
             frames=self.bee_frames, 
             pos=((self.level_width + WINDOW_WIDTH), (randint(0, self.level_height))), 
             groups=(self.all_sprites, self.enemy_sprites), 
@@ -43,32 +59,66 @@ class Game:
 
     def create_bullet(self, pos, direction): 
         x = pos[0] + direction * 34 if direction == 1 else pos[0] + direction * 34 - self.bullet_surf.get_width() 
-        Bullet(self.bullet_surf, (x, pos[1]), direction, (self.all_sprites, self.bullet_sprites)) 
-        Fire(self.fire_surf, pos, self.all_sprites, self.player) 
+        self.pools['bullet'].spawn(self.bullet_surf, (x, pos[1]), direction, (self.all_sprites, self.bullet_sprites)) 
+        self.pools['fire'].spawn(self.fire_surf, pos, self.all_sprites, self.player) 
         self.audio['shoot'].play() 
 
-    def load_assets(self): 
+    def pool_stats(self): 
+        return {name: pool.stats for name, pool in self.pools.items()} 
+
+    def entity_counts(self): 
+        return { 
+            'all': len(self.all_sprites), 
+            'collision': len(self.collision_sprites), 
+            'bullets': len(self.bullet_sprites), 
+            'enemies': len(self.enemy_sprites), 
+        } 
+
+    def draw_loading(self, done, total): 
+        # progress bar while assets decode, events pumped so the window stays responsive 
+        pygame.event.pump() 
+        bar = pygame.FRect(0, 0, WINDOW_WIDTH / 2, 12) 
+        bar.center = (WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2) 
+        self.display_surface.fill(BG_COLOR) 
+        pygame.draw.rect(self.display_surface, 'white', (bar.left, bar.top, bar.width * done / total, bar.height)) 
+        pygame.draw.rect(self.display_surface, 'white', bar, 1) 
+        pygame.display.update() 
+
+    def load_assets(self, progress = None): 
+        preload(r'C:\Users\Swift3\Desktop\superrabbitch_shooting\images', r'C:\Users\Swift3\Desktop\superrabbitch_shooting\audio', progress = progress) 
+
         # Absolute paths for graphics 
-        self.player_frames = import_folder(r'C:\Users\Swift3\Desktop\superrabbitch_shooting\images\player')  # Updated path 
+        self.player_frames = flip_frames(import_folder(r'C:\Users\Swift3\Desktop\superrabbitch_shooting\images\player'))  # Updated path 
         self.bullet_surf = import_image(r'C:\Users\Swift3\Desktop\superrabbitch_shooting\images\gun', 'bullet')  # Updated path 
         self.fire_surf = import_image(r'C:\Users\Swift3\Desktop\superrabbitch_shooting\images\gun', 'fire')  # Updated path 
         self.bee_frames = import_folder(r'C:\Users\Swift3\Desktop\superrabbitch_shooting\images\enemies\bee')  # Updated path 
-        self.worm_frames = import_folder(r'C:\Users\Swift3\Desktop\superrabbitch_shooting\images\enemies\worm')  # Updated path 
+        self.worm_frames = flip_frames(import_folder(r'C:\Users\Swift3\Desktop\superrabbitch_shooting\images\enemies\worm'))  # Updated path 
 
         # Absolute path for sounds 
         self.audio = audio_importer(r'C:\Users\Swift3\Desktop\superrabbitch_shooting\audio')  # Updated path 
 
     def setup(self, map_name="world2.tmx"): 
         # Absolute path for map file 
-        tmx_map = load_pygame(rf'C:\Users\Swift3\Desktop\superrabbitch_shooting\data\maps\{map_name}')  # Updated path 
+        tmx_map = import_map(rf'C:\Users\Swift3\Desktop\superrabbitch_shooting\data\maps\{map_name}')  # Updated path 
         self.level_width = tmx_map.width * TILE_SIZE 
         self.level_height = tmx_map.height * TILE_SIZE 
+        self.bullet_sprites.bounds = pygame.FRect(0, 0, self.level_width, self.level_height) 
 
+        # static layers are either baked into chunk surfaces or kept as one sprite per tile 
+        self.all_sprites.static_tiles = TileChunks() if BAKE_STATIC_TILES else None 
         for x, y, image in tmx_map.get_layer_by_name('Main').tiles(): 
-            Sprite((x * TILE_SIZE, y * TILE_SIZE), image, (self.all_sprites, self.collision_sprites)) 
+            if BAKE_STATIC_TILES: 
+                self.all_sprites.static_tiles.add((x * TILE_SIZE, y * TILE_SIZE), image) 
+                Sprite((x * TILE_SIZE, y * TILE_SIZE), image, self.collision_sprites) 
+            else: 
+                Sprite((x * TILE_SIZE, y * TILE_SIZE), image, (self.all_sprites, self.collision_sprites)) 
+        self.collision_sprites.build_grid() 
 
         for x, y, image in tmx_map.get_layer_by_name('Decoration').tiles(): 
-            Sprite((x * TILE_SIZE, y * TILE_SIZE), image, self.all_sprites) 
+            if BAKE_STATIC_TILES: 
+                self.all_sprites.static_tiles.add((x * TILE_SIZE, y * TILE_SIZE), image) 
+            else: 
+                Sprite((x * TILE_SIZE, y * TILE_SIZE), image, self.all_sprites) 
 
         for obj in tmx_map.get_layer_by_name('Entities'): 
             if obj.name == 'Player': 
@@ -79,6 +129,8 @@ class Game:
                     self.player_frames, 
                     self.create_bullet, 
                 ) 
+                # gestures from hand_control.py count as key presses 
+                self.player.input_source = self.gestures.keys 
             if obj.name == 'Worm': 
                 Worm( 
                     self.worm_frames, 
@@ -88,8 +140,9 @@ class Game:
 
     def collision(self): 
         # Bullets -> enemies 
+        self.enemy_sprites.refresh() 
         for bullet in self.bullet_sprites: 
-            sprite_collision = pygame.sprite.spritecollide(bullet, self.enemy_sprites, False, pygame.sprite.collide_mask) 
+            sprite_collision = self.enemy_sprites.collide(bullet, pygame.sprite.collide_mask) 
             if sprite_collision: 
                 self.audio['impact'].play() 
                 bullet.kill() 
@@ -103,7 +156,8 @@ class Game:
     def run(self): 
         self.show_menu()  # Show the menu before starting the game 
         while self.running: 
-            dt = self.clock.tick(FRAMERATE) / 1000 
+            frame_time = self.clock.tick(FRAMERATE) / 1000 
+            self.profiler.begin() 
 
             for event in pygame.event.get(): 
                 if event.type == pygame.QUIT: 
@@ -113,12 +167,21 @@ class Game:
                         self.running = False 
                     if event.key == pygame.K_p:  # Pause game 
                         self.paused = not self.paused 
+                self.profiler.handle_event(event) 
+            self.profiler.mark('events') 
 
             if not self.paused: 
                 # Update 
-                self.bee_timer.update() 
-                self.all_sprites.update(dt) 
-                self.collision() 
+                for dt in self.simulation.steps(frame_time): 
+                    scheduler.update() 
+                    self.profiler.mark('timers', step = True) 
+                    self.all_sprites.snapshot() 
+                    self.all_sprites.update(dt) 
+                    self.bullet_sprites.expire(dt) 
+                    self.profiler.mark('update', step = True) 
+                    self.collision() 
+                    self.profiler.mark('collision', step = True) 
+                self.profiler.end_steps() 
 
                 # Check for game duration or score
                 if self.mode == 'Countdown':
@@ -128,35 +191,37 @@ class Game:
                 elif self.mode == 'Adventure' and self.score >= 500:
                     self.switch_to_world_tmx()  # Switch to world.tmx when score reaches 500 
 
-                # Draw 
+                # Draw, blended between the last two simulation steps 
+                alpha = self.simulation.alpha 
                 self.display_surface.fill(BG_COLOR) 
-                self.all_sprites.draw(self.player.rect.center) 
+                self.all_sprites.draw(self.all_sprites.interpolated_center(self.player, alpha), alpha) 
 
                 # Display score and countdown 
                 self.display_score() 
                 if self.mode == 'Countdown': 
                     self.display_countdown(elapsed_time) 
 
+                self.profiler.draw(self.display_surface) 
+                self.profiler.mark('draw') 
+
             pygame.display.update() 
+            self.profiler.mark('display') 
 
         # Show final score 
         self.show_final_score() 
         pygame.quit() 
 
     def display_score(self): 
-        font = pygame.font.Font(None, 36) 
-        score_surface = font.render(f'Score: {self.score}', True, (255, 255, 255)) 
+        score_surface = render_text(f'Score: {self.score}', 36, (255, 255, 255)) 
         self.display_surface.blit(score_surface, (10, 10))  # Display score at the top-left corner 
 
     def display_countdown(self, elapsed_time): 
         remaining_time = max(0, self.game_duration - int(elapsed_time)) 
-        font = pygame.font.Font(None, 36) 
-        countdown_surface = font.render(f'Time: {remaining_time}', True, (255, 255, 255)) 
+        countdown_surface = render_text(f'Time: {remaining_time}', 36, (255, 255, 255)) 
         self.display_surface.blit(countdown_surface, (WINDOW_WIDTH - 100, 10))  # Display countdown at the top-right corner 
 
     def show_final_score(self): 
-        font = pygame.font.Font(None, 74) 
-        final_score_surface = font.render(f'Final Score: {self.score}', True, (255, 255, 255)) 
+        final_score_surface = render_text(f'Final Score: {self.score}', 74, (255, 255, 255)) 
         self.display_surface.fill((0, 0, 0))  # Fill the screen with black 
         self.display_surface.blit(final_score_surface, (WINDOW_WIDTH // 2 - final_score_surface.get_width() // 2, WINDOW_HEIGHT // 2)) 
         pygame.display.update() 
@@ -170,12 +235,11 @@ class Game:
 
         while menu_active: 
             self.display_surface.fill((0, 0, 0)) 
-            font = pygame.font.Font(None, 74) 
 
             # Display game mode options 
             for i, option in enumerate(game_options): 
                 color = (255, 255, 255) if i == selected_option else (150, 150, 150) 
-                text_surface = font.render(option, True, color) 
+                text_surface = render_text(option, 74, color) 
                 self.display_surface.blit(text_surface, (WINDOW_WIDTH // 2 - text_surface.get_width() // 2, WINDOW_HEIGHT // 2 - 50 + i * 100)) 
 
             pygame.display.update() 
@@ -209,12 +273,11 @@ class Game:
 
         while time_menu_active:
             self.display_surface.fill((0, 0, 0))
-            font = pygame.font.Font(None, 74)
 
             # Display time selection options
             for i, time_option in enumerate(time_options):
                 color = (255, 255, 255) if i == time_selected else (150, 150, 150)
-                text_surface = font.render(time_option, True, color)
+                text_surface = render_text(time_option, 74, color)
                 self.display_surface.blit(text_surface, (WINDOW_WIDTH // 2 - text_surface.get_width() // 2, WINDOW_HEIGHT // 2 - 50 + i * 100))
 
             pygame.display.update()
@@ -241,7 +304,8 @@ class Game:
         self.setup()  # Setup the game again with default map "world2.tmx"
 
         while self.running:
-            dt = self.clock.tick(FRAMERATE) / 1000
+            frame_time = self.clock.tick(FRAMERATE) / 1000
+            self.profiler.begin()
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -251,12 +315,21 @@ class Game:
                         self.running = False
                     if event.key == pygame.K_p:  # Pause game
                         self.paused = not self.paused
+                self.profiler.handle_event(event)
+            self.profiler.mark('events')
 
             if not self.paused:
                 # Update
-                self.bee_timer.update()
-                self.all_sprites.update(dt)
-                self.collision()
+                for dt in self.simulation.steps(frame_time):
+                    scheduler.update()
+                    self.profiler.mark('timers', step = True)
+                    self.all_sprites.snapshot()
+                    self.all_sprites.update(dt)
+                    self.bullet_sprites.expire(dt)
+                    self.profiler.mark('update', step = True)
+                    self.collision()
+                    self.profiler.mark('collision', step = True)
+                self.profiler.end_steps()
 
                 # Check for game duration or score
                 if self.mode == 'Countdown':
@@ -266,16 +339,21 @@ class Game:
                 elif self.mode == 'Adventure' and self.score >= 500:
                     self.switch_to_world_tmx()  # Switch to world.tmx when score reaches 500
 
-                # Draw
+                # Draw, blended between the last two simulation steps
+                alpha = self.simulation.alpha
                 self.display_surface.fill(BG_COLOR)
-                self.all_sprites.draw(self.player.rect.center)
+                self.all_sprites.draw(self.all_sprites.interpolated_center(self.player, alpha), alpha)
 
                 # Display score and countdown
                 self.display_score()
                 if self.mode == 'Countdown':
                     self.display_countdown(elapsed_time)
 
+                self.profiler.draw(self.display_surface)
+                self.profiler.mark('draw')
+
             pygame.display.update()
+            self.profiler.mark('display')
 
         # Show final score
         self.show_final_score()
@@ -289,6 +367,7 @@ class Game:
         self.setup("world.tmx")  # Load new map
         self.score = 0  # Reset score for the new map
         self.start_time = pygame.time.get_ticks()  # Reset start time
+        self.bee_timer.cancel()
         self.bee_timer = Timer(100, func=self.create_bee, autostart=True, repeat=True)  # Reset bee timer
 
 if __name__ == '__main__':
@@ -1,12 +1,38 @@
 from settings import * 
+from heapq import heappush, heappop
+
+class Scheduler:
+    def __init__(self, clock = pygame.time.get_ticks):
+        self.clock = clock
+        self.queue = []
+        self.count = 0
+
+    def schedule(self, timer):
+        self.count += 1
+        heappush(self.queue, (timer.start_time + timer.duration, self.count, timer, timer.generation))
+
+    def clear(self):
+        self.queue.clear()
+
+    def update(self):
+        now = self.clock()
+        while self.queue and self.queue[0][0] <= now:
+            _, _, timer, generation = heappop(self.queue)
+            # entries of cancelled or restarted timers are dropped lazily
+            if timer.active and timer.generation == generation:
+                timer.expire()
+
+scheduler = Scheduler()
 
 class Timer:
-    def __init__(self, duration, func = None, repeat = None, autostart = False):
+    def __init__(self, duration, func = None, repeat = None, autostart = False, scheduler = scheduler):
         self.duration = duration
         self.start_time = 0
         self.active = False
         self.func = func
         self.repeat = repeat
+        self.scheduler = scheduler
+        self.generation = 0
 
         if autostart:
             self.activate()
@@ -16,7 +42,9 @@ class Timer:
 
     def activate(self):
         self.active = True
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = self.scheduler.clock()
+        self.generation += 1
+        self.scheduler.schedule(self)
 
     def deactivate(self):
         self.active = False
@@ -24,8 +52,41 @@ class Timer:
         if self.repeat:
             self.activate()
 
+    def cancel(self):
+        self.active = False
+        self.start_time = 0
+        self.generation += 1
+
+    def expire(self):
+        generation = self.generation
+        if self.func:
+            self.func()
+        # func may have cancelled or restarted the timer itself
+        if self.generation == generation:
+            self.deactivate()
+
     def update(self):
-        if pygame.time.get_ticks() - self.start_time >= self.duration:
-            if self.func and self.start_time != 0:
-                self.func()
-            self.deactivate()
\ No newline at end of file
+        # timers fire from the shared scheduler, this only flushes it for older call sites
+        self.scheduler.update()
+
+class FixedStep:
+    def __init__(self, rate = SIMULATION_RATE, max_steps = MAX_SIMULATION_STEPS):
+        self.step = 1 / rate
+        self.max_steps = max_steps
+        self.accumulator = 0
+        self.ticks = 0
+
+    def clock(self):
+        return self.ticks
+
+    def steps(self, frame_time):
+        # a slow frame runs several steps, capped so the game slows down instead of spiralling
+        self.accumulator = min(self.accumulator + frame_time, self.step * self.max_steps)
+        while self.accumulator >= self.step:
+            self.accumulator -= self.step
+            self.ticks += self.step * 1000
+            yield self.step
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.step
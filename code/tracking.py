@@ -0,0 +1,156 @@
+from settings import *
+from gestures import Gesture, NO_GESTURE
+from time import perf_counter, sleep
+import threading
+
+# loaded by the tracker threads, the game itself never waits on them
+cv2 = lazy_import('cv2')
+mp = lazy_import('mediapipe')
+
+def classify(hands, captured):
+    left = right = jump = False
+    for hand in hands or ():
+        lm = hand.landmark
+        if lm[8].y < lm[7].y and lm[12].y < lm[11].y:  # Jump condition
+            jump = True
+        elif lm[4].y < lm[3].y:  # Move left
+            left = True
+        elif lm[20].y < lm[19].y:  # Move right
+            right = True
+    return Gesture(left, right, jump, False, captured, perf_counter())
+
+class LatestValue:
+    # one slot, a new value replaces whatever nobody has taken yet
+    def __init__(self, value = None):
+        self.condition = threading.Condition()
+        self.value = value
+        self.count = 0
+
+    def put(self, value):
+        with self.condition:
+            self.value = value
+            self.count += 1
+            self.condition.notify_all()
+
+    def wait(self, seen, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.count != seen, timeout)
+            return self.count, self.value
+
+class AdaptiveInput:
+    # skips frames where nothing moved, the model only sees frames worth looking at
+    def __init__(self, motion = HAND_MOTION_THRESHOLD):
+        self.motion = motion
+        self.thumbnail = None
+        self.stats = {'processed': 0, 'skipped': 0}
+
+    def moved(self, frame):
+        # compared with the last frame the model saw, so slow drift still adds up
+        thumbnail = cv2.cvtColor(cv2.resize(frame, (32, 24), interpolation = cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        if self.thumbnail is not None and cv2.absdiff(thumbnail, self.thumbnail).mean() < self.motion:
+            self.stats['skipped'] += 1
+            return False
+        self.thumbnail = thumbnail
+        self.stats['processed'] += 1
+        return True
+
+class HandTracker:
+    def __init__(self, camera_index = CAMERA_INDEX, preview = HAND_PREVIEW, classify = classify, publish = None, model_complexity = 1, adaptive = HAND_ADAPTIVE):
+        self.camera_index = camera_index
+        self.preview = preview
+        self.classify = classify
+        self.publish = publish
+        self.model_complexity = model_complexity
+        self.adaptive = AdaptiveInput() if adaptive else None
+        self.frames = LatestValue()
+        self.gestures = LatestValue(NO_GESTURE)
+        self.running = False
+        self.quit_requested = False
+        self.threads = []
+        self.stats = {'captured': 0, 'processed': 0, 'dropped': 0, 'camera_failures': 0}
+
+    def start(self):
+        # LazyLoader is not thread safe, finish both imports here before the workers touch them
+        cv2.VideoCapture, mp.solutions
+        self.running = True
+        self.threads = [threading.Thread(target = target, daemon = True) for target in (self.capture, self.infer)]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.running = False
+        for thread in self.threads:
+            thread.join()
+
+    def alive(self):
+        return all(thread.is_alive() for thread in self.threads)
+
+    def gesture(self):
+        # never blocks, a stalled camera or a lost hand reads as no gesture
+        gesture = self.gestures.value
+        return gesture if perf_counter() - gesture.published < GESTURE_TIMEOUT else NO_GESTURE
+
+    def capture(self):
+        camera = None
+        try:
+            while self.running:
+                # a missing or unplugged camera is retried every CAMERA_RETRY seconds instead of spinning
+                if camera is None:
+                    camera = cv2.VideoCapture(self.camera_index)
+                    if not camera.isOpened():
+                        camera.release()
+                        camera = None
+                        self.stats['camera_failures'] += 1
+                        sleep(CAMERA_RETRY)
+                        continue
+
+                ok, frame = camera.read()
+                if ok:
+                    self.frames.put((perf_counter(), frame))
+                    self.stats['captured'] += 1
+                else:
+                    camera.release()
+                    camera = None
+                    self.stats['camera_failures'] += 1
+                    sleep(CAMERA_RETRY)
+        finally:
+            if camera is not None:
+                camera.release()
+
+    def infer(self):
+        # frames that arrived while the model was busy are skipped, only the newest one is processed
+        seen = 0
+        options = {'max_num_hands': 1, 'model_complexity': self.model_complexity, 'min_detection_confidence': 0.5, 'min_tracking_confidence': 0.5}
+        hands = mp.solutions.hands.Hands(static_image_mode = False, **options)
+        try:
+            while self.running:
+                count, item = self.frames.wait(seen, 0.1)
+                if count == seen:
+                    continue
+                self.stats['dropped'] += count - seen - 1
+                seen = count
+
+                captured, frame = item
+                frame = cv2.flip(frame, 1)
+                hands_found = None
+                if self.adaptive and not self.adaptive.moved(frame):
+                    # nothing moved, the last gesture still holds and keeps the capture time it was measured from
+                    gesture = self.gestures.value._replace(published = perf_counter())
+                else:
+                    hands_found = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)).multi_hand_landmarks
+                    gesture = self.classify(hands_found, captured)
+                    self.stats['processed'] += 1
+                self.gestures.put(gesture)
+                if self.publish:
+                    self.publish(gesture)
+
+                if self.preview:
+                    for hand in hands_found or ():
+                        mp.solutions.drawing_utils.draw_landmarks(frame, hand, mp.solutions.hands.HAND_CONNECTIONS)
+                    cv2.imshow('Hand Tracking', frame)
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        self.quit_requested = True
+        finally:
+            hands.close()
+            if self.preview:
+                cv2.destroyAllWindows()